@@ -1,28 +1,179 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import google.generativeai as genai
 import os
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.exceptions import FailedPrecondition, NotFound
 import uuid
 from dotenv import load_dotenv
 import json
+import hashlib
+import hmac
+import gzip
+import math
+import functools
+import click
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import orjson
+from swr_store import StaleWhileRevalidateStore, Degraded
+from rate_limit import TokenBucketLimiter, ConcurrencyGate, UpstreamBusy
+from single_flight import SingleFlight
+from cache_backends import make_cache_backend, MemoryBackend
+from cache_manager import CacheManager
+from forecast_features import daily_agro_features, summarize_features
+from semantic_cache import SemanticCache
+import chat_archive
+from tracing import Tracer
+from db_instrumentation import (InstrumentedClient, UsageMetrics, BudgetExceeded, start_usage, finish_usage,
+                                current_usage, assert_within_budget)
+from profiler import ProfileSessions
+from translation import TranslationMemo, SUPPORTED_LANGUAGES, normalize_language
+from plant_gate import make_plant_gate
+from geo_alerts import geohash_encode, geohash_center, parse_coordinates, evaluate_alerts, alert_document
 # from threading import Thread
 # import time
 from flask_cors import CORS
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson-backed encoder that keeps Flask's key sorting and date formatting"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# Render terminates connections at its proxy; trust that many X-Forwarded-For hops
+# so rate limits key on the client's address rather than the proxy's
+PROXY_COUNT = int(os.environ.get('PROXY_COUNT', 1))
+if PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_COUNT, x_proto=PROXY_COUNT)
 CORS(app)
 
+# Request tracing: spans are recorded for every request, but only traces slower
+# than TRACE_SLOW_SECONDS (always) or a TRACE_SAMPLE_RATE sample are kept
+tracer = Tracer(
+    sample_rate=float(os.environ.get('TRACE_SAMPLE_RATE', 0.01)),
+    slow_threshold=float(os.environ.get('TRACE_SLOW_SECONDS', 3)),
+    capacity=int(os.environ.get('TRACE_BUFFER_SIZE', 100))
+)
+
+@app.before_request
+def start_trace():
+    g.trace_token = tracer.start(
+        f"{request.method} {request.path}", method=request.method, path=request.path, endpoint=request.endpoint
+    )
+
+@app.after_request
+def record_trace_status(response):
+    g.trace_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_trace(exc):
+    token = g.pop('trace_token', None)
+    if token:
+        tracer.finish(token, status=g.get('trace_status'), error=str(exc) if exc else None)
+
+def record_firestore_op(kind, path, started, duration, error, count):
+    tracer.add_span(f"firestore.{kind}", started, duration, error, path=path, docs=count)
+
+# Per-request Firestore accounting: round trips and written documents per endpoint
+# must stay within these limits. Over-budget requests are logged and counted in
+# /debug/firestore; with FIRESTORE_BUDGET_STRICT=1 (CI) they fail with a 500 instead.
+# /addCrop, /deleteAllChats and /batch write once per crop, chat or operation, so only
+# their round trips are capped (one commit covers up to 500 writes). Endpoints that place a user
+# in a weather tile may also write the geoTiles index (new tile, and the old one on a move).
+# tests/test_firestore_budgets.py checks every entry against a fake Firestore.
+FIRESTORE_BUDGETS = {
+    'medical_chat': {'roundTrips': 4, 'writes': 3, 'deletes': 0},
+    'analyze_image': {'roundTrips': 4, 'writes': 3, 'deletes': 0},
+    'add_crop': {'roundTrips': 2, 'deletes': 0},
+    'update_crop': {'roundTrips': 2, 'writes': 2, 'deletes': 0},
+    'delete_crop': {'roundTrips': 2, 'writes': 2, 'deletes': 1},
+    'get_crops': {'roundTrips': 2, 'writes': 1, 'deletes': 0},
+    'sync': {'roundTrips': 4, 'writes': 1, 'deletes': 0},
+    'get_daily_suggestion': {'roundTrips': 3, 'writes': 3, 'deletes': 0},
+    'get_suggestions': {'roundTrips': 3, 'writes': 3, 'deletes': 0},
+    'dashboard': {'roundTrips': 3, 'writes': 3, 'deletes': 0},
+    'get_chats': {'roundTrips': 2, 'writes': 1, 'deletes': 0},
+    'get_chat': {'roundTrips': 2, 'writes': 1, 'deletes': 0},
+    'delete_all_chats': {'roundTrips': 3},
+    'batch_operations': {'roundTrips': 4},
+    'get_farmer_profile': {'roundTrips': 1, 'reads': 1, 'writes': 0, 'deletes': 0},
+    'update_farmer_profile': {'roundTrips': 2, 'reads': 0, 'writes': 3, 'deletes': 0},
+    'get_weather': {'roundTrips': 0},
+    'home': {'roundTrips': 0},
+    'health': {'roundTrips': 0},
+}
+FIRESTORE_BUDGET_STRICT = os.environ.get('FIRESTORE_BUDGET_STRICT') == '1'
+FIRESTORE_USAGE_HEADERS = os.environ.get('FIRESTORE_USAGE_HEADERS') == '1'
+firestore_metrics = UsageMetrics()
+
+@app.before_request
+def start_firestore_usage():
+    g.usage_token = start_usage()
+
+@app.after_request
+def account_firestore_usage(response):
+    """Record this request's Firestore usage, check its budget and expose it to debug clients"""
+    usage = current_usage()
+    if g.get('usage_token') is None or usage is None:
+        return response
+    counts = usage.to_dict()
+    over_budget = False
+    budget = FIRESTORE_BUDGETS.get(request.endpoint)
+    if budget:
+        try:
+            assert_within_budget(counts, budget, request.endpoint)
+        except BudgetExceeded as e:
+            over_budget = True
+            print(f"⚠️  {e}")
+            if FIRESTORE_BUDGET_STRICT:
+                response = jsonify({'success': False, 'error': str(e)})
+                response.status_code = 500
+    firestore_metrics.record(request.endpoint or request.path, counts, over_budget)
+
+    if FIRESTORE_USAGE_HEADERS or is_debug_request():
+        for field, header in (('reads', 'Reads'), ('writes', 'Writes'), ('deletes', 'Deletes'),
+                              ('bytes', 'Bytes'), ('roundTrips', 'Round-Trips')):
+            response.headers[f'X-Firestore-{header}'] = str(counts[field])
+    return response
+
+@app.teardown_request
+def finish_firestore_usage(exc):
+    token = g.pop('usage_token', None)
+    if token is not None:
+        finish_usage(token)
+
 # Initialize Firebase
 firebase_key = os.getenv("FIREBASE_KEY")
-cred = credentials.Certificate(json.loads(firebase_key))
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+if firebase_key:
+    cred = credentials.Certificate(json.loads(firebase_key))
+    firebase_admin.initialize_app(cred)
+    db = InstrumentedClient(firestore.client(), record_firestore_op)
+else:
+    # The app still imports (tests swap in a fake client), but every Firestore call fails
+    print("⚠️  Warning: FIREBASE_KEY not found - Firestore endpoints will not work")
+    db = None
 
 # Configure APIs
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
@@ -30,17 +181,105 @@ OPENWEATHER_API_KEY = os.environ.get('OPENWEATHER_API_KEY')
 HF_MODEL_API_URL = os.environ.get('HF_MODEL_API_URL')
 
 if not GEMINI_API_KEY:
-    print("❌ Error: GEMINI_API_KEY not found")
-    exit(1)
+    print("⚠️  Warning: GEMINI_API_KEY not found - chat, suggestions and image analysis will not work")
 if not OPENWEATHER_API_KEY:
-    print("❌ Error: OPENWEATHER_API_KEY not found")
-    exit(1)
+    print("⚠️  Warning: OPENWEATHER_API_KEY not found - weather will not work")
 if not HF_MODEL_API_URL:
     print("⚠️  Warning: HF_MODEL_API_URL not found - image analysis will not work")
 
 genai.configure(api_key=GEMINI_API_KEY)
 print("✅ APIs configured successfully")
 
+# Shared by all workers on the host (SQLite file by default, see CACHE_BACKEND) so
+# weather and Gemini results survive restarts and are not fetched once per worker
+shared_cache = make_cache_backend()
+SUGGESTION_CACHE_TTL = 6 * 60 * 60
+EXPLANATION_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Weather and suggestions are served from stale-while-revalidate stores so a slow
+# or failing upstream never adds to request latency while a recent value exists
+weather_store = StaleWhileRevalidateStore('weather', fresh_for=10 * 60, stale_for=3 * 60 * 60, backend=shared_cache)
+suggestion_store = StaleWhileRevalidateStore('suggestions', fresh_for=30 * 60, stale_for=6 * 60 * 60, backend=shared_cache)
+
+# Near-duplicate first-turn /chat questions reuse an earlier answer (per worker, per language)
+semantic_cache = SemanticCache(
+    threshold=float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.85)),
+    max_partitions=int(os.environ.get('SEMANTIC_CACHE_LANGUAGES', 4))
+)
+
+# Local plant/not-plant check in front of the Gemini validation call (PLANT_GATE=off disables it)
+plant_gate = make_plant_gate()
+
+# Cold chats are compacted into one compressed blob per user; this local
+# directory stands in for an object store bucket. Archiving is refused unless it is
+# set to durable storage, since the blob becomes the only copy of the messages
+CHAT_ARCHIVE_DIR = os.environ.get('CHAT_ARCHIVE_DIR')
+chat_blob_store = chat_archive.LocalBlobStore(CHAT_ARCHIVE_DIR) if CHAT_ARCHIVE_DIR else None
+CHAT_ARCHIVE_AFTER_DAYS = int(os.environ.get('CHAT_ARCHIVE_AFTER_DAYS', 30))
+# Chat messages are appended only if the chat is unchanged since it was read, so one
+# archived in between is restored first; this many tries before giving up
+CHAT_WRITE_ATTEMPTS = 3
+
+# lastActive is written at most once per ACTIVITY_WRITE_INTERVAL seconds per user and worker
+ACTIVITY_WRITE_INTERVAL = int(os.environ.get('ACTIVITY_WRITE_INTERVAL', 60))
+recent_activity = OrderedDict()   # user_id -> (monotonic time of last write, geoTile)
+recent_activity_lock = threading.Lock()
+
+# Weather alerts fetch one forecast per occupied geohash tile, a few tiles at a time
+ALERT_FETCH_WORKERS = int(os.environ.get('ALERT_FETCH_WORKERS', 4))
+
+# /debug/* endpoints are disabled unless DEBUG_TOKEN is set, and then need it in X-Debug-Token
+DEBUG_TOKEN = os.environ.get('DEBUG_TOKEN')
+
+# Admission control: every user gets a token bucket, and endpoints that fan out
+# to Gemini / Hugging Face spend far more of it than plain Firestore reads.
+# RATE_LIMIT_DB points all workers on a host at one SQLite file for exact limits.
+RATE_LIMIT_PER_MINUTE = float(os.environ.get('RATE_LIMIT_PER_MINUTE', 60))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', 120))
+ENDPOINT_COSTS = {
+    'medical_chat': 10,
+    'analyze_image': 25,
+    'get_suggestions': 10,
+    'get_daily_suggestion': 5,
+    'get_weather': 2,
+    'dashboard': 8,
+    'batch_operations': 5,
+    'home': 0,
+    'health': 0,
+}
+rate_limiter = TokenBucketLimiter(
+    RATE_LIMIT_PER_MINUTE / 60, RATE_LIMIT_BURST, db_path=os.environ.get('RATE_LIMIT_DB')
+)
+# Host-wide cap on concurrent calls to each upstream. Slots are taken around the
+# HTTP / Gemini call itself (cache hits take none, background refreshes and pool
+# threads do) and shared by all gunicorn workers through one SQLite file.
+UPSTREAM_LIMITS = {'gemini': 8, 'hf': 4, 'openweather': 8}
+UPSTREAM_WAIT_SECONDS = float(os.environ.get('UPSTREAM_WAIT_SECONDS', 2))
+upstream_gate = ConcurrencyGate(
+    UPSTREAM_LIMITS, db_path=os.environ.get('RATE_LIMIT_DB') or '/tmp/agrihive-upstreams.db'
+)
+
+# Duplicate LLM requests (app retries on flaky links) attach to the in-flight
+# one, and a finished successful response is replayed for a short window
+idempotent_responses = SingleFlight(replay_for=60)
+
+# Every in-process cache registers with one manager that keeps their combined size
+# under CACHE_MEMORY_MB per worker. Eviction weighs size and idle time against the
+# cost to recompute an entry, relative to one Firestore read.
+cache_manager = CacheManager(int(os.environ.get('CACHE_MEMORY_MB', 64)) * 1024 * 1024)
+RECOMPUTE_COSTS = {'firestore': 1, 'openweather': 10, 'gemini': 100}
+managed_caches = [
+    ('weather', weather_store, RECOMPUTE_COSTS['openweather']),
+    ('suggestions', suggestion_store, RECOMPUTE_COSTS['gemini']),
+    ('semantic_chat', semantic_cache, RECOMPUTE_COSTS['gemini']),
+    ('idempotent_responses', idempotent_responses, RECOMPUTE_COSTS['gemini']),
+]
+if isinstance(shared_cache, MemoryBackend):
+    # Gemini outputs and translations when CACHE_BACKEND=memory
+    managed_caches.append(('shared', shared_cache, RECOMPUTE_COSTS['gemini']))
+for name, cache, cost in managed_caches:
+    cache.account = cache_manager.register(name, cost, cache.discard)
+
 # =======================
 # KEEP-ALIVE FUNCTIONALITY
 # =======================
@@ -76,13 +315,116 @@ def validate_user_id(user_id):
         return False
     return True
 
-def update_user_activity(user_id):
+def update_user_activity(user_id, lat=None, lon=None):
     try:
-        user_ref = db.collection("users").document(user_id)
-        user_ref.set({"lastActive": datetime.now()}, merge=True)
+        activity = {"lastActive": datetime.now()}
+        if lat is not None and lon is not None:
+            # Same write keeps the user's alert tile current at no extra cost
+            activity.update(geo_fields(lat, lon))
+        # lastActive only needs minute-level precision; skip the write if this worker
+        # recorded it recently and the user has not moved to another tile
+        now = time.monotonic()
+        with recent_activity_lock:
+            last_written, last_tile = recent_activity.get(user_id, (None, None))
+        tile = activity.get("geoTile", last_tile)
+        if last_written is not None and now - last_written < ACTIVITY_WRITE_INTERVAL and tile == last_tile:
+            return
+        writes = [("merge", db.collection("users").document(user_id), activity)]
+        if "geoTile" in activity and tile != last_tile:
+            writes += tile_index_writes(user_id, tile, last_tile)
+        commit_writes(writes)
+        with recent_activity_lock:
+            recent_activity[user_id] = (now, tile)
+            recent_activity.move_to_end(user_id)
+            while len(recent_activity) > 10000:
+                recent_activity.popitem(last=False)
     except Exception as e:
         app.logger.warning(f"Could not update user activity for {user_id}: {e}")
 
+def geo_fields(lat, lon):
+    """User document fields that place the user in a weather alert tile"""
+    return {"lastLocation": {"lat": lat, "lon": lon}, "geoTile": geohash_encode(lat, lon)}
+
+def tile_index_writes(user_id, tile, old_tile=None):
+    """Writes that list the user under geoTiles/{tile}, the index the alert job reads instead of every user"""
+    writes = [("merge", db.collection("geoTiles").document(tile),
+               {"members": firestore.ArrayUnion([user_id]), "updatedAt": firestore.SERVER_TIMESTAMP})]
+    if old_tile and old_tile != tile:
+        writes.append(("merge", db.collection("geoTiles").document(old_tile),
+                       {"members": firestore.ArrayRemove([user_id])}))
+    return writes
+
+def request_coordinates():
+    """(lat, lon) only when the client sent both, so default coordinates never move a user's alert tile"""
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    return (lat, lon) if lat is not None and lon is not None else (None, None)
+
+def is_debug_request():
+    token = request.headers.get('X-Debug-Token', '')
+    return bool(DEBUG_TOKEN) and hmac.compare_digest(token, DEBUG_TOKEN)
+
+def require_debug_token(view):
+    """Hide a debug endpoint unless the request carries the configured DEBUG_TOKEN"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_debug_request():
+            return jsonify({'error': 'Not found'}), 404
+        return view(*args, **kwargs)
+    return wrapper
+
+def request_user_id():
+    """Best-effort user id from query string, JSON body or form, for rate limiting"""
+    user_id = request.args.get('userId') or request.args.get('user_id')
+    if not user_id and request.is_json:
+        data = request.get_json(silent=True) or {}
+        if isinstance(data, dict):
+            user_id = data.get('user_id') or data.get('userId')
+    if not user_id:
+        user_id = request.form.get('user_id')
+    return user_id if validate_user_id(user_id) else None
+
+def rate_limit_key():
+    user_id = request_user_id()
+    return f"user:{user_id}" if user_id else f"ip:{request.remote_addr}"
+
+@app.before_request
+def admit_request():
+    """Reject with 429 before any work when the user is over budget"""
+    if request.method == 'OPTIONS':
+        return None
+
+    cost = ENDPOINT_COSTS.get(request.endpoint, 1)
+    if cost:
+        wait = rate_limiter.take(rate_limit_key(), cost)
+        if wait:
+            response = jsonify({'success': False, 'error': 'Rate limit exceeded, please retry later'})
+            response.headers['Retry-After'] = str(math.ceil(wait))
+            return response, 429
+    return None
+
+@contextmanager
+def upstream_slot(name):
+    """Hold one of the host-wide slots for upstream name around a single call to it"""
+    slot = upstream_gate.acquire(name, UPSTREAM_WAIT_SECONDS)
+    if slot is None:
+        if has_request_context():
+            g.upstream_busy = name
+        raise UpstreamBusy(f"Too many concurrent {name} calls")
+    try:
+        yield
+    finally:
+        upstream_gate.release(name, slot)
+
+@app.after_request
+def report_upstream_busy(response):
+    """A request that failed for lack of an upstream slot gets a retryable 503 instead of a 500"""
+    if g.get('upstream_busy') and response.status_code >= 500:
+        response = jsonify({'success': False, 'error': 'Server busy, please retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '2'
+    return response
+
 def call_hf_model_api(image_data, is_file=True):
     """Call the Hugging Face model API for disease prediction"""
     try:
@@ -91,20 +433,22 @@ def call_hf_model_api(image_data, is_file=True):
         
         if is_file:
             files = {'image': image_data}
-            response = requests.post(
-                f"{HF_MODEL_API_URL}/predict",
-                files=files,
-                timeout=30
-            )
+            with upstream_slot('hf'), tracer.span('http.hf_predict'):
+                response = requests.post(
+                    f"{HF_MODEL_API_URL}/predict",
+                    files=files,
+                    timeout=30
+                )
         else:
             headers = {'Content-Type': 'application/json'}
             data = {'image': image_data}
-            response = requests.post(
-                f"{HF_MODEL_API_URL}/predict",
-                json=data,
-                headers=headers,
-                timeout=30
-            )
+            with upstream_slot('hf'), tracer.span('http.hf_predict'):
+                response = requests.post(
+                    f"{HF_MODEL_API_URL}/predict",
+                    json=data,
+                    headers=headers,
+                    timeout=30
+                )
         
         response.raise_for_status()
         return response.json()
@@ -116,18 +460,38 @@ def call_hf_model_api(image_data, is_file=True):
         print(f"Error in HF model API call: {e}")
         raise
 
-def generate_farming_suggestions_with_gemini(crops, weather_data):
-    """Generate farming suggestions using Gemini AI based on user's actual crops and weather"""
-    try:
-        crop_info = []
-        for crop in crops:
-            crop_info.append(f"- {crop['name']} ({crop.get('type', 'unknown type')}, planted {crop['days_old']} days ago)")
-        
-        crops_text = "\n".join(crop_info)
-
-        if weather_data:
-            current_weather = weather_data['current']
-            weather_text = f"""
+def generate_with_gemini(contents, cache_ttl=None, parse=None):
+    """Return gemini-2.5-flash's text for contents, or parse(text); with cache_ttl, cached by prompt once parse succeeds"""
+    def call():
+        model = genai.GenerativeModel('gemini-2.5-flash')
+        with upstream_slot('gemini'), tracer.span('gemini.generate_content', cached=bool(cache_ttl)):
+            text = model.generate_content(contents).text
+        # Raising here keeps malformed output out of the cache, so the next request asks again
+        return parse(text) if parse else text
+
+    if not cache_ttl:
+        return call()
+    key = ('gemini:parsed:' if parse else 'gemini:') + hashlib.sha256(json.dumps(contents).encode('utf-8')).hexdigest()
+    return shared_cache.get_or_compute(key, cache_ttl, call)
+
+def request_farming_suggestions(crops, weather_data):
+    """Ask Gemini for farming suggestions, raising if the call itself fails"""
+    crop_info = []
+    for crop in crops:
+        crop_info.append(f"- {crop['name']} ({crop.get('type', 'unknown type')}, planted {crop['days_old']} days ago)")
+    
+    crops_text = "\n".join(crop_info)
+
+    if weather_data and weather_data.get('daily'):
+        current_weather = weather_data['current']
+        weather_text = (
+            f"Current weather: {current_weather['temperature']}°C (feels like {current_weather['feels_like']}°C), "
+            f"humidity {current_weather['humidity']}%, {current_weather['description']}, wind {current_weather['wind_speed']} m/s\n"
+            + summarize_features(weather_data['daily'])
+        )
+    elif weather_data:
+        current_weather = weather_data['current']
+        weather_text = f"""
 Current Weather:
 - Temperature: {current_weather['temperature']}°C (feels like {current_weather['feels_like']}°C)
 - Humidity: {current_weather['humidity']}%
@@ -137,13 +501,13 @@ Current Weather:
 
 Forecast (next 24 hours):
 """
-            for i, forecast in enumerate(weather_data['forecast'][:4]):
-                weather_text += f"- {forecast['date']}: {forecast['temp']}°C, {forecast['description']}, Rain: {forecast['rain']}mm\n"
-        else:
-            weather_text = "Weather data not available"
+        for i, forecast in enumerate(weather_data['forecast'][:4]):
+            weather_text += f"- {forecast['date']}: {forecast['temp']}°C, {forecast['description']}, Rain: {forecast['rain']}mm\n"
+    else:
+        weather_text = "Weather data not available"
 
-        
-        prompt = f"""
+    
+    prompt = f"""
 You are an expert agricultural advisor. Based on the farmer's crops and current weather conditions, provide 4 practical farming suggestions.
 
 Farmer's Crops:
@@ -175,30 +539,41 @@ Example format:
 ]
 """
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+    return generate_with_gemini(
+        prompt, cache_ttl=SUGGESTION_CACHE_TTL, parse=lambda raw_text: parse_farming_suggestions(raw_text, crops)
+    )
+
+def parse_farming_suggestions(raw_text, crops):
+    """Suggestions from Gemini's JSON (or, failing that, plain text) reply, raising ValueError if it has none"""
+    # Try to parse JSON response
+    try:
+        response_text = raw_text.strip()
+        if response_text.startswith('```json'):
+            response_text = response_text[7:-3]
+        elif response_text.startswith('```'):
+            response_text = response_text[3:-3]
         
-        # Try to parse JSON response
-        try:
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-            
-            suggestions = json.loads(response_text)
-            
-            # Validate the response format
-            if isinstance(suggestions, list) and len(suggestions) >= 4:
-                return suggestions[:4]
-            else:
-                raise ValueError("Invalid suggestion format")
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Failed to parse Gemini JSON response: {e}")
-            # Fallback to text parsing
-            return parse_text_suggestions(response.text, crops)
+        suggestions = json.loads(response_text)
+        
+        # Validate the response format
+        if isinstance(suggestions, list) and len(suggestions) >= 4:
+            return suggestions[:4]
+        else:
+            raise ValueError("Invalid suggestion format")
             
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Failed to parse Gemini JSON response: {e}")
+        # Fallback to text parsing
+        suggestions = parse_text_suggestions(raw_text, crops)
+        if not suggestions:
+            raise ValueError("No suggestions found in Gemini response")
+        return suggestions
+
+
+def generate_farming_suggestions_with_gemini(crops, weather_data):
+    """Generate farming suggestions using Gemini AI based on user's actual crops and weather"""
+    try:
+        return request_farming_suggestions(crops, weather_data)
     except Exception as e:
         print(f"Error generating suggestions with Gemini: {e}")
         return generate_fallback_suggestions(crops, weather_data)
@@ -240,15 +615,28 @@ def generate_fallback_suggestions(crops, weather_data):
     suggestions = []
     temp = weather_data['current']['temperature'] if weather_data else 25
     humidity = weather_data['current']['humidity'] if weather_data else 65
+    # Next two days of forecast features, when the weather data carries them
+    upcoming = weather_data.get('daily', [])[:2] if weather_data else []
+    rain_ahead = sum(day['rain'] for day in upcoming)
+    humid_hours = max((day['humid_hours'] for day in upcoming), default=0)
+    peak_temp = max((day['temp_max'] for day in upcoming), default=temp)
     
     for i, crop in enumerate(crops[:4]):
         crop_name = crop['name']
         days_old = crop['days_old']
         
-        if temp > 30:
-            suggestion = f"Provide shade or extra water to your {crop_name} - high temperature ({temp}°C) can stress the plants"
+        if temp > 30 or peak_temp >= 38:
+            suggestion = f"Provide shade or extra water to your {crop_name} - high temperature ({max(temp, peak_temp)}°C) can stress the plants"
             category = "protection"
             priority = "high"
+        elif rain_ahead >= 20:
+            suggestion = f"Skip irrigating your {crop_name} and clear drainage channels - about {rain_ahead:g}mm of rain is expected in the next two days"
+            category = "irrigation"
+            priority = "high"
+        elif humid_hours >= 6:
+            suggestion = f"Check your {crop_name} for fungal diseases - humidity stays above 90% for {humid_hours} hours in the coming days"
+            category = "protection"
+            priority = "medium"
         elif humidity > 80:
             suggestion = f"Check your {crop_name} for fungal diseases - high humidity ({humidity}%) increases disease risk"
             category = "protection"
@@ -271,20 +659,20 @@ def generate_fallback_suggestions(crops, weather_data):
     
     return suggestions
 
-def generate_daily_suggestion_with_gemini(crops, weather_data):
-    """Generate a single daily suggestion using Gemini"""
-    import random
-    try:
-        crop_names = [crop['name'] for crop in crops]
-        crops_text = ", ".join(crop_names)
-        
-        if weather_data:
-            current_weather = weather_data['current']
-            weather_text = f"Temperature: {current_weather['temperature']}°C, Humidity: {current_weather['humidity']}%, Weather: {current_weather['description']}"
-        else:
-            weather_text = "Weather data not available"
-
-        prompt = f"""
+def request_daily_suggestion(crops, weather_data):
+    """Ask Gemini for a single daily suggestion, raising if the call or its JSON fails"""
+    crop_names = [crop['name'] for crop in crops]
+    crops_text = ", ".join(crop_names)
+    
+    if weather_data:
+        current_weather = weather_data['current']
+        weather_text = f"Temperature: {current_weather['temperature']}°C, Humidity: {current_weather['humidity']}%, Weather: {current_weather['description']}"
+        if weather_data.get('daily'):
+            weather_text += "\n" + summarize_features(weather_data['daily'], days=2)
+    else:
+        weather_text = "Weather data not available"
+
+    prompt = f"""
 You are a helpful farming assistant. Suggest ONE short tip for today's farm activity.
 
 Farmer's crops (with sowing date): {crops_text}
@@ -304,86 +692,455 @@ Format:
 """
 
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
-        try:
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-            
-            suggestion = json.loads(response_text)
-            
-            if 'heading' in suggestion and 'body' in suggestion:
-                return suggestion
-            else:
-                raise ValueError("Invalid suggestion format")
-                
-        except (json.JSONDecodeError, ValueError):
-            selected_crop = random.choice(crops)['name']
-            temp = weather_data['current']['temperature'] if weather_data else 25
-            
-            return {
-                "heading": "Good morning farmer! 🌱",
-                "body": f"Check on your {selected_crop} today - with {temp}°C weather, it's a great day for farming!"
-            }
-            
-    except Exception as e:
-        print(f"Error generating daily suggestion: {e}")
-        # Simple fallback
-        selected_crop = random.choice(crops)['name']
-        return {
-            "heading": "Farm check time! 🚜",
-            "body": f"How's your {selected_crop} doing today? A quick inspection never hurts!"
-        }
+    return generate_with_gemini(prompt, cache_ttl=SUGGESTION_CACHE_TTL, parse=parse_daily_suggestion)
 
-def get_weather_data(lat, lon):
-    """Fetch current weather and 5-day forecast"""
+def parse_daily_suggestion(response_text):
+    """The {heading, body} object in Gemini's reply, raising ValueError if it is missing or malformed"""
+    response_text = response_text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:-3]
+    elif response_text.startswith('```'):
+        response_text = response_text[3:-3]
+    
+    suggestion = json.loads(response_text)
+    
+    if isinstance(suggestion, dict) and 'heading' in suggestion and 'body' in suggestion:
+        return suggestion
+    else:
+        raise ValueError("Invalid suggestion format")
+
+def generate_daily_suggestion_with_gemini(crops, weather_data):
+    """Generate a single daily suggestion using Gemini"""
     try:
-        # Current weather
-        current_url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric"
-        current_response = requests.get(current_url, timeout=10)
-        current_response.raise_for_status()
-        current_data = current_response.json()
-        
+        return request_daily_suggestion(crops, weather_data)
+    except Exception as e:
+        print(f"Error generating daily suggestion: {e}")
+        return generate_fallback_daily_suggestion(crops, weather_data)
+
+FALLBACK_DAILY_HEADINGS = {
+    'protection': "Protect your crops today! 🛡️",
+    'irrigation': "Watering check 💧",
+    'harvesting': "Harvest time? 🌾",
+    'fertilizer': "Farm check time! 🚜",
+}
+
+def generate_fallback_daily_suggestion(crops, weather_data):
+    """Daily suggestion from the same local rules as generate_fallback_suggestions, without Gemini"""
+    suggestions = generate_fallback_suggestions(crops, weather_data)
+    suggestion = next((s for s in suggestions if s['priority'] == 'high'), suggestions[0])
+    return {
+        "heading": FALLBACK_DAILY_HEADINGS.get(suggestion['category'], "Good morning farmer! 🌱"),
+        "body": suggestion['text']
+    }
+
+def fetch_weather_data(lat, lon):
+    """Fetch current weather and 5-day forecast from OpenWeather, raising on failure"""
+    def fetch_forecast():
         forecast_url = f"http://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric"
-        forecast_response = requests.get(forecast_url, timeout=10)
+        with upstream_slot('openweather'), tracer.span('http.openweather_forecast'):
+            forecast_response = requests.get(forecast_url, timeout=10)
         forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
-        
-        return {
-            'current': {
-                'temperature': current_data['main']['temp'],
-                'humidity': current_data['main']['humidity'],
-                'description': current_data['weather'][0]['description'],
-                'wind_speed': current_data['wind']['speed'],
-                'pressure': current_data['main']['pressure'],
-                'feels_like': current_data['main']['feels_like']
-            },
-            'forecast': [
-                {
-                    'date': item['dt_txt'],
-                    'temp': item['main']['temp'],
-                    'humidity': item['main']['humidity'],
-                    'description': item['weather'][0]['description'],
-                    'rain': item.get('rain', {}).get('3h', 0)
-                }
-                for item in forecast_data['list'][:8]
-            ]
-        }
+        return forecast_response.json()
+
+    # The forecast request runs alongside the current weather one instead of after it
+    forecast_future = openweather_pool.submit(tracer.wrap(fetch_forecast))
 
+    # Current weather
+    current_url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric"
+    with upstream_slot('openweather'), tracer.span('http.openweather_current'):
+        current_response = requests.get(current_url, timeout=10)
+    current_response.raise_for_status()
+    current_data = current_response.json()
+
+    forecast_data = forecast_future.result()
+    
+    return {
+        'current': {
+            'temperature': current_data['main']['temp'],
+            'humidity': current_data['main']['humidity'],
+            'description': current_data['weather'][0]['description'],
+            'wind_speed': current_data['wind']['speed'],
+            'pressure': current_data['main']['pressure'],
+            'feels_like': current_data['main']['feels_like']
+        },
+        'forecast': [
+            {
+                'date': item['dt_txt'],
+                'temp': item['main']['temp'],
+                'humidity': item['main']['humidity'],
+                'description': item['weather'][0]['description'],
+                'rain': item.get('rain', {}).get('3h', 0)
+            }
+            for item in forecast_data['list'][:8]
+        ],
+        # Computed once per tile fetch and cached with it in weather_store
+        'daily': daily_agro_features(
+            forecast_data['list'], lat, forecast_data.get('city', {}).get('timezone', 0)
+        )
+    }
+
+# Forecast requests issued from fetch_weather_data; tile fetches for multi-point
+# /weather use their own pool so a tile never waits on a thread of its own pool
+openweather_pool = ThreadPoolExecutor(max_workers=16)
+weather_points_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('WEATHER_FETCH_WORKERS', 8)))
+MAX_WEATHER_POINTS = 50
+
+def weather_tile(lat, lon):
+    """Snap coordinates to a ~1 km tile so nearby farms share one weather fetch"""
+    return (round(lat, 2), round(lon, 2))
+
+def get_weather_data_with_age(lat, lon):
+    """Return (weather_data, age_seconds) from the weather store, or (None, None)"""
+    tile = weather_tile(lat, lon)
+    try:
+        return weather_store.get(tile, lambda: fetch_weather_data(*tile))
     except Exception as e:
         print(f"❌ Weather API error: {e}")
+        return None, None
+
+def get_weather_data(lat, lon):
+    """Fetch current weather and 5-day forecast"""
+    return get_weather_data_with_age(lat, lon)[0]
+
+def crops_fingerprint(crops):
+    """Stable hash of the crop fields that feed suggestion prompts"""
+    summary = json.dumps([[c['name'], c.get('type', ''), c['days_old']] for c in crops], sort_keys=True)
+    return hashlib.sha1(summary.encode('utf-8')).hexdigest()
+
+
+def format_crop(doc):
+    """Shape a crop document the way /getCrops and /sync return it"""
+    crop_data = doc.to_dict()
+    return {
+        "id": doc.id,
+        "name": str(crop_data.get('name', '')),
+        "type": str(crop_data.get('type', '')),
+        "plantedDate": str(crop_data.get('sowedDate') or crop_data.get('plantedDate', '')),
+        "area": str(crop_data.get('area', '')),
+    }
+
+CHAT_SUMMARY_FIELDS = ["createdAt", "updatedAt", "lastMessage"]
+
+def format_chat_summary(doc):
+    """Shape a chat document the way /getChats and /sync return it"""
+    data = doc.to_dict()
+    created_at = data.get("createdAt")
+    return {
+        "chatId": doc.id,
+        "lastMessage": data.get("lastMessage", ""),
+        "createdAt": created_at.isoformat() if created_at else None,
+        "updatedAt": data.get("updatedAt", created_at).isoformat() if data.get("updatedAt") else None
+    }
+
+# Tombstones carry expireAt so a Firestore TTL policy can purge them; clients
+# whose token is older than this get a full snapshot instead of a delta
+TOMBSTONE_RETENTION_DAYS = 30
+# Sync tokens are backdated so writes committing while /sync reads are not missed
+SYNC_CLOCK_SKEW = timedelta(seconds=5)
+
+def encode_sync_token(moment):
+    return str(int(moment.timestamp() * 1000))
+
+def decode_sync_token(token):
+    """Turn a sync token back into an aware UTC datetime, raising ValueError if malformed"""
+    try:
+        return datetime.fromtimestamp(int(token) / 1000, tz=timezone.utc)
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"Invalid sync token: {e}")
+
+# Writes are staged as (method, ref, data) tuples so single-item endpoints and
+# /batch share the same logic and can pack them into as few batches as possible
+BATCH_WRITE_LIMIT = 500   # Firestore's cap on writes per batch
+
+def stage_writes(batch, writes):
+    for method, ref, data in writes:
+        if method == "delete":
+            batch.delete(ref)
+        elif method == "merge":
+            batch.set(ref, data, merge=True)
+        else:
+            getattr(batch, method)(ref, data)
+
+def commit_writes(writes):
+    """Commit writes in order, in as few batches as Firestore allows; returns the number of batches"""
+    commits = 0
+    for start in range(0, len(writes), BATCH_WRITE_LIMIT):
+        batch = db.batch()
+        stage_writes(batch, writes[start:start + BATCH_WRITE_LIMIT])
+        batch.commit()
+        commits += 1
+    return commits
+
+def commit_with_fallback(writes, fallback=None):
+    """Commit writes, or fallback instead if they hit a missing document; returns the number of batches"""
+    try:
+        return commit_writes(writes)
+    except NotFound:
+        if not fallback:
+            raise
+        return commit_writes(fallback)
+
+def tombstone_write(user_id, kind, item_id):
+    """Record a deletion alongside it so /sync can report it"""
+    tombstone_ref = db.collection("users").document(user_id).collection("tombstones").document(f"{kind}-{item_id}")
+    return ("set", tombstone_ref, {
+        "kind": kind,
+        "itemId": item_id,
+        "deletedAt": firestore.SERVER_TIMESTAMP,
+        "expireAt": datetime.now(timezone.utc) + timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    })
+
+def crop_ref(user_id, crop_id):
+    return db.collection("users").document(user_id).collection("crops").document(crop_id)
+
+def add_crop_writes(user_id, crop_data_list):
+    """Writes for new crops, plus the cropsAdded entries /addCrop reports"""
+    writes, added_crops = [], []
+    for crop_data in crop_data_list:
+        crop_id = str(uuid.uuid4())
+        crop_data["timestamp"] = datetime.now().isoformat()
+        writes.append(("set", crop_ref(user_id, crop_id), {**crop_data, "updatedAt": firestore.SERVER_TIMESTAMP}))
+        added_crops.append({"cropId": crop_id, "data": crop_data})
+    return writes, added_crops
+
+def update_crop_writes(user_id, crop_id, crop_data):
+    # update, not set: fails with NotFound if the crop was deleted meanwhile
+    return [("update", crop_ref(user_id, crop_id), {**crop_data, "updatedAt": firestore.SERVER_TIMESTAMP})]
+
+def delete_crop_writes(user_id, crop_id):
+    return [("delete", crop_ref(user_id, crop_id), None), tombstone_write(user_id, "crop", crop_id)]
+
+def delete_chats_writes(user_id):
+    """Writes deleting every chat of the user (one delete and one tombstone each), and the chat count"""
+    chats = db.collection("users").document(user_id).collection("chats").select(CHAT_SUMMARY_FIELDS).stream()
+    writes = []
+    for doc in chats:
+        writes.append(("delete", doc.reference, None))
+        writes.append(tombstone_write(user_id, "chat", doc.id))
+    return writes, len(writes) // 2
+
+def delete_chat_archives(user_id):
+    if chat_blob_store is None:
+        return
+    for key in chat_archive.archive_keys(user_id):
+        chat_blob_store.delete(key)
+
+def archived_messages(chat_id, chat_data):
+    """Messages of an archived chat stub, read back from the user's archive blob"""
+    records = chat_archive.read_archive(chat_blob_store, chat_data['archiveKey'])
+    return records.get(chat_id, {}).get('messages', [])
+
+def unarchive_chat(user_id, chat_id, chat_doc):
+    """Move an archived chat's messages back into Firestore before it receives new ones; returns (messages, update time)"""
+    chat_ref = db.collection("users").document(user_id).collection("chats").document(chat_id)
+    messages = chat_archive.parse_timestamps(archived_messages(chat_id, chat_doc.to_dict()))
+    try:
+        result = chat_ref.update({
+            "messages": messages,
+            "archived": firestore.DELETE_FIELD,
+            "archiveKey": firestore.DELETE_FIELD,
+            "messageCount": firestore.DELETE_FIELD
+        }, option=db.write_option(last_update_time=chat_doc.update_time))
+        return messages, result.update_time
+    except FailedPrecondition:
+        # Another request restored it first and may already have added messages
+        current = chat_ref.get()
+        if (current.to_dict() or {}).get('archived'):
+            return unarchive_chat(user_id, chat_id, current)
+        return (current.to_dict() or {}).get('messages', []), current.update_time
+
+def append_chat_messages(user_id, chat_id, read_at, message_data, last_message):
+    """Add messages to a chat unless it changed since read_at, restoring it first if an archive run stubbed it"""
+    chat_ref = db.collection("users").document(user_id).collection("chats").document(chat_id)
+    for _ in range(CHAT_WRITE_ATTEMPTS):
+        try:
+            chat_ref.update({
+                "lastMessage": last_message,
+                "updatedAt": datetime.now(),
+                "messages": firestore.ArrayUnion(message_data)
+            }, option=db.write_option(last_update_time=read_at))
+            return
+        except FailedPrecondition:
+            chat_doc = chat_ref.get()
+            if (chat_doc.to_dict() or {}).get('archived'):
+                _, read_at = unarchive_chat(user_id, chat_id, chat_doc)
+            else:
+                read_at = chat_doc.update_time
+    raise FailedPrecondition(f"Chat {chat_id} kept changing; gave up after {CHAT_WRITE_ATTEMPTS} attempts")
+
+def etag_for(*parts):
+    """Strong ETag from the values (ids, update times) that determine a response body"""
+    return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+def not_modified(etag):
+    """Return a 304 response if the client's If-None-Match already holds etag"""
+    # compress_response suffixes the tag per encoding, so accept those variants too,
+    # and echo back the one the client holds so caches keep a consistent validator
+    for tag in (etag, etag + '-gzip', etag + '-br'):
+        if request.if_none_match.contains(tag):
+            response = app.response_class(status=304)
+            response.set_etag(tag)
+            return response
+    return None
+
+def json_with_etag(payload, etag):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+def idempotent(derive_key=None):
+    """Serve duplicate requests (same Idempotency-Key, or derived key) from a single execution"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get('Idempotency-Key') or (derive_key() if derive_key else None)
+            if not key:
+                return view(*args, **kwargs)
+
+            def run():
+                response = app.make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, response.headers.get('Content-Type')
+
+            data, status, content_type = idempotent_responses.do(
+                (request.endpoint, request_user_id(), key), run,
+                replayable=lambda result: 200 <= result[1] < 300
+            )
+            return app.response_class(data, status=status, content_type=content_type)
+        return wrapper
+    return decorator
+
+def user_crop_docs(user_id):
+    """The user's crop documents, streamed once per request and shared with the key derivation"""
+    if 'crop_docs' not in g:
+        g.crop_docs = list(db.collection("users").document(user_id).collection("crops").stream())
+    return g.crop_docs
+
+def suggestion_request_key():
+    """Location, language and crop versions: anything that changes the response changes the key"""
+    user_id = request_user_id()
+    if not user_id:
         return None
+    crops = sorted((doc.id, str(doc.update_time)) for doc in user_crop_docs(user_id))
+    parts = [request.args.get('lat'), request.args.get('lon'), (request.args.get('lang') or '').strip().lower(), crops]
+    return hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()
+
+COMPRESS_MIN_BYTES = 1024
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON bodies with brotli or gzip when the client accepts it"""
+    if (not 200 <= response.status_code < 300 or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli and accepted['br']:
+        body, encoding = brotli.compress(data, quality=4), 'br'
+    elif accepted['gzip']:
+        body, encoding = gzip.compress(data, compresslevel=5), 'gzip'
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
 
 
 #Weather endpoint---------------------------------------------------------------------------------------------------------
 
-@app.route('/weather', methods=['GET'])
+def parse_weather_points():
+    """Points from ?points=lat,lon;lat,lon or a JSON body {"points": [{"lat": .., "lon": ..}]}, or None if absent"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if data is None:
+            return None
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        raw = data.get('points')
+        if raw is None:
+            return None
+        if not isinstance(raw, list):
+            raise ValueError("points must be a list")
+        pairs = []
+        for p in raw:
+            if isinstance(p, dict) and 'lat' in p and 'lon' in p:
+                pairs.append((p['lat'], p['lon']))
+            elif isinstance(p, (list, tuple)) and len(p) == 2:
+                pairs.append(tuple(p))
+            else:
+                raise ValueError(f"Invalid point: {p}")
+    else:
+        raw = request.args.get('points')
+        if raw is None:
+            return None
+        pairs = [tuple(part.split(',')) for part in raw.split(';') if part.strip()]
+
+    points = []
+    for pair in pairs:
+        try:
+            lat, lon = (float(value) for value in pair)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid point: {pair}")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Point out of range: {lat},{lon}")
+        points.append((lat, lon))
+    if not points:
+        raise ValueError("points must not be empty")
+    if len(points) > MAX_WEATHER_POINTS:
+        raise ValueError(f"At most {MAX_WEATHER_POINTS} points per request")
+    return points
+
+def multi_point_weather(points):
+    """Weather for each point, fetching every distinct tile once and concurrently"""
+    tiles = list(dict.fromkeys(weather_tile(lat, lon) for lat, lon in points))
+
+    # The request already paid for one tile; charge the rest like separate /weather calls
+    extra_cost = ENDPOINT_COSTS['get_weather'] * (len(tiles) - 1)
+    if extra_cost:
+        wait = rate_limiter.take(rate_limit_key(), extra_cost)
+        if wait:
+            response = jsonify({'success': False, 'error': 'Rate limit exceeded, please retry later'})
+            response.headers['Retry-After'] = str(math.ceil(wait))
+            return response, 429
+
+    futures = [weather_points_pool.submit(tracer.wrap(get_weather_data_with_age), *tile) for tile in tiles]
+    fetched = {tile: future.result() for tile, future in zip(tiles, futures)}
+
+    results = []
+    for lat, lon in points:
+        tile = weather_tile(lat, lon)
+        weather_data, data_age = fetched[tile]
+        result = {'location': {'lat': lat, 'lon': lon}, 'tile': {'lat': tile[0], 'lon': tile[1]}}
+        if weather_data:
+            result.update({'success': True, 'weather': weather_data, 'dataAge': int(data_age)})
+        else:
+            result.update({'success': False, 'error': 'Failed to fetch weather data'})
+        results.append(result)
+
+    return jsonify({
+        'success': all(result['success'] for result in results),
+        'results': results,
+        'tilesFetched': len(tiles)
+    })
+
+@app.route('/weather', methods=['GET', 'POST'])
 def get_weather():
     try:
+        try:
+            points = parse_weather_points()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if points is not None:
+            return multi_point_weather(points)
+
         lat = request.args.get('lat', type=float)
         lon = request.args.get('lon', type=float)
 
@@ -393,14 +1150,15 @@ def get_weather():
                 'error': 'Latitude and longitude are required.'
             }), 400
         
-        weather_data = get_weather_data(lat, lon)
+        weather_data, data_age = get_weather_data_with_age(lat, lon)
         if not weather_data:
             return jsonify({'success': False, 'error': 'Failed to fetch weather data'}), 500
             
         return jsonify({
             'success': True,
             'weather': weather_data,
-            'location': {'lat': lat, 'lon': lon}
+            'location': {'lat': lat, 'lon': lon},
+            'dataAge': int(data_age)
         })
 
     except Exception as e:
@@ -411,12 +1169,19 @@ def get_weather():
 
 # Chat endpoint---------------------------------------------------------------------------------------------------------
 @app.route('/chat', methods=['POST'])
+@idempotent()
 def medical_chat():
     try:
         data = request.get_json()
         message = data.get('message', '')
         user_id = data.get('user_id') or data.get('userId')
         chat_id = data.get('chat_id') or data.get('chatId')
+        # Cache partition: a supported language, anything else shares the English one
+        try:
+            language = normalize_language(data.get('language')) or 'en'
+        except ValueError:
+            language = 'en'
+        use_cache = not data.get('no_cache') and 'no-cache' not in request.headers.get('Cache-Control', '')
         
         # Validate user_id
         if not validate_user_id(user_id):
@@ -431,11 +1196,16 @@ def medical_chat():
         # Get chat history
         history = []
         is_new_chat = False
+        read_at = None
         
         if chat_id:
             chat_doc = db.collection("users").document(user_id).collection("chats").document(chat_id).get()
             if chat_doc.exists:
-                messages = chat_doc.to_dict().get('messages', [])
+                chat_data = chat_doc.to_dict()
+                if chat_data.get('archived'):
+                    messages, read_at = unarchive_chat(user_id, chat_id, chat_doc)
+                else:
+                    messages, read_at = chat_data.get('messages', []), chat_doc.update_time
                 history = [f"{msg['sender']}: {msg['message']}" for msg in messages[-5:]]
             else:
                 chat_id = None
@@ -454,9 +1224,15 @@ def medical_chat():
         Respond helpfully but always remind users to consult doctors for serious concerns.
         """
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        bot_response = response.text
+        # Only first turns: an answer shaped by one farmer's conversation must never reach another
+        cacheable = use_cache and not history
+        cached = semantic_cache.lookup(message, language) if cacheable else None
+        if cached:
+            bot_response = cached[0]
+        else:
+            bot_response = generate_with_gemini(prompt)
+            if cacheable:
+                semantic_cache.store(message, bot_response, language)
         
         # Save to Firebase
         message_data = [
@@ -472,18 +1248,15 @@ def medical_chat():
                 "messages": message_data
             })
         else:
-            db.collection("users").document(user_id).collection("chats").document(chat_id).update({
-                "lastMessage": bot_response,
-                "updatedAt": datetime.now(),
-                "messages": firestore.ArrayUnion(message_data)
-            })
+            append_chat_messages(user_id, chat_id, read_at, message_data, bot_response)
         
         return jsonify({
             'success': True,
             'response': bot_response,
             'chat_id': chat_id,
             'user_id': user_id,
-            'is_new_chat': is_new_chat
+            'is_new_chat': is_new_chat,
+            'from_cache': bool(cached)
         })
         
     except Exception as e:
@@ -504,7 +1277,6 @@ def analyze_image():
 
         try:
             image_file.seek(0)
-            model = genai.GenerativeModel('gemini-2.5-flash')
             
             image_data = image_file.read()
             image_file.seek(0)
@@ -516,8 +1288,13 @@ def analyze_image():
             
             crop_validation_prompt = "Look at this image and respond with only 'crop' if this is an image of a crop/plant/agricultural product, or 'not crop' if it's not. Give only one of these two responses, nothing else."
             
-            crop_response = model.generate_content([crop_validation_prompt, image_part])
-            crop_result = crop_response.text.strip().lower()
+            # Clear-cut images are decided locally; only ambiguous ones cost a Gemini call
+            crop_result = None
+            if plant_gate:
+                with tracer.span('plant_gate'):
+                    crop_result = plant_gate.classify(image_data)
+            if crop_result is None:
+                crop_result = generate_with_gemini([crop_validation_prompt, image_part]).strip().lower()
             
             # Checking if the image is identified as a crop
             if crop_result != "crop":
@@ -526,6 +1303,10 @@ def analyze_image():
                     chat_doc = db.collection("users").document(user_id).collection("chats").document(chat_id).get()
                     if not chat_doc.exists:
                         chat_id = None
+                    elif chat_doc.to_dict().get('archived'):
+                        _, read_at = unarchive_chat(user_id, chat_id, chat_doc)
+                    else:
+                        read_at = chat_doc.update_time
                         
                 if not chat_id:
                     chat_id = str(uuid.uuid4())
@@ -548,11 +1329,7 @@ def analyze_image():
                             "messages": message_data
                         })
                     else:
-                        db.collection("users").document(user_id).collection("chats").document(chat_id).update({
-                            "lastMessage": bot_message,
-                            "updatedAt": datetime.now(),
-                            "messages": firestore.ArrayUnion(message_data)
-                        })
+                        append_chat_messages(user_id, chat_id, read_at, message_data, bot_message)
                 except Exception as e:
                     pass
 
@@ -590,9 +1367,8 @@ def analyze_image():
             """
             
             try:
-                model = genai.GenerativeModel('gemini-2.5-flash')
-                response = model.generate_content(prompt)
-                gemini_explanation = response.text
+                # The prompt depends only on the label, so explanations are shared across users
+                gemini_explanation = generate_with_gemini(prompt, cache_ttl=EXPLANATION_CACHE_TTL)
             except Exception as e:
                 gemini_explanation = f"Detected: {predicted_label}. Please consult with an agricultural expert for detailed analysis and treatment recommendations."
 
@@ -601,6 +1377,10 @@ def analyze_image():
                 chat_doc = db.collection("users").document(user_id).collection("chats").document(chat_id).get()
                 if not chat_doc.exists:
                     chat_id = None
+                elif chat_doc.to_dict().get('archived'):
+                    _, read_at = unarchive_chat(user_id, chat_id, chat_doc)
+                else:
+                    read_at = chat_doc.update_time
                     
             if not chat_id:
                 chat_id = str(uuid.uuid4())
@@ -623,11 +1403,7 @@ def analyze_image():
                         "messages": message_data
                     })
                 else:
-                    db.collection("users").document(user_id).collection("chats").document(chat_id).update({
-                        "lastMessage": bot_message,
-                        "updatedAt": datetime.now(),
-                        "messages": firestore.ArrayUnion(message_data)
-                    })
+                    append_chat_messages(user_id, chat_id, read_at, message_data, bot_message)
             except Exception as e:
                 pass
 
@@ -661,12 +1437,8 @@ def add_crop():
 
         update_user_activity(user_id)
 
-        added_crops = []
-        for crop_data in crop_data_list:
-            crop_id = str(uuid.uuid4())
-            crop_data["timestamp"] = datetime.now().isoformat()
-            db.collection("users").document(user_id).collection("crops").document(crop_id).set(crop_data)
-            added_crops.append({"cropId": crop_id, "data": crop_data})
+        writes, added_crops = add_crop_writes(user_id, crop_data_list)
+        commit_writes(writes)
 
         return jsonify({
             "message": "Crop(s) added successfully",
@@ -694,8 +1466,7 @@ def update_crop():
 
         update_user_activity(user_id)
 
-        crop_data["updatedAt"] = datetime.now()
-        db.collection("users").document(user_id).collection("crops").document(crop_id).update(crop_data)
+        commit_writes(update_crop_writes(user_id, crop_id, crop_data))
 
         return jsonify({"message": "Crop updated successfully", "userId": user_id})
     except Exception as e:
@@ -721,7 +1492,7 @@ def delete_crop():
 
         update_user_activity(user_id)
 
-        db.collection("users").document(user_id).collection("crops").document(crop_id).delete()
+        commit_writes(delete_crop_writes(user_id, crop_id))
         return jsonify({"message": "Crop deleted successfully", "userId": user_id})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -739,22 +1510,72 @@ def get_crops():
         update_user_activity(user_id)
 
         crops_ref = db.collection("users").document(user_id).collection("crops")
-        crops = crops_ref.stream()
-
-        crop_list = []
-        for crop in crops:
-            crop_data = crop.to_dict()
-            crop_list.append({
-                "id": crop.id,
-                "name": str(crop_data.get('name', '')),
-                "type": str(crop_data.get('type', '')),
-                "plantedDate": str(crop_data.get('sowedDate') or crop_data.get('plantedDate', '')),
-                "area": str(crop_data.get('area', '')),
-            })
+        crops = list(crops_ref.stream())
 
-        return jsonify({
+        etag = etag_for(user_id, [(crop.id, crop.update_time) for crop in crops])
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        crop_list = [format_crop(crop) for crop in crops]
+
+        return json_with_etag({
             "crops": crop_list,
             "userId": user_id
+        }, etag)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+
+
+
+
+
+
+# Delta sync endpoint-------------------------------------------------------------------------------------------------------
+@app.route('/sync', methods=['GET'])
+def sync():
+    try:
+        user_id = request.args.get('userId')
+        since = request.args.get('since')
+
+        # Validate user_id
+        if not validate_user_id(user_id):
+            return jsonify({"error": "Valid userId is required"}), 400
+
+        since_time = None
+        if since:
+            try:
+                since_time = decode_sync_token(since)
+            except ValueError:
+                return jsonify({"error": "Invalid sync token"}), 400
+
+        update_user_activity(user_id)
+
+        now = datetime.now(timezone.utc)
+        full = since_time is None or since_time < now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+        user_ref = db.collection("users").document(user_id)
+        crops_query = user_ref.collection("crops")
+        chats_query = user_ref.collection("chats").select(CHAT_SUMMARY_FIELDS)
+        deleted = {"crops": [], "chats": []}
+
+        if not full:
+            crops_query = crops_query.where("updatedAt", ">", since_time)
+            chats_query = chats_query.where("updatedAt", ">", since_time)
+            tombstones = user_ref.collection("tombstones").where("deletedAt", ">", since_time).stream()
+            for tombstone in tombstones:
+                data = tombstone.to_dict()
+                deleted.setdefault(data.get("kind", "") + "s", []).append(data.get("itemId"))
+
+        return jsonify({
+            "userId": user_id,
+            "full": full,
+            "crops": [format_crop(doc) for doc in crops_query.stream()],
+            "chats": [format_chat_summary(doc) for doc in chats_query.stream()],
+            "deleted": deleted,
+            "syncToken": encode_sync_token(now - SYNC_CLOCK_SKEW)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -762,13 +1583,117 @@ def get_crops():
 
 
 
+def daily_suggestion_crops(crop_docs):
+    """Name, type and age in days of each crop document, as the daily suggestion prompt uses them"""
+    crops = []
+    current_date = datetime.now()
+    
+    for doc in crop_docs:
+        crop_data = doc.to_dict()
+        try:
+            sowed_date = datetime.strptime(crop_data.get('sowedDate', ''), '%Y-%m-%d')
+            days_old = (current_date - sowed_date).days
+            crops.append({
+                'name': crop_data.get('name', 'Unknown Crop'),
+                'type': crop_data.get('type', ''),
+                'days_old': days_old
+            })
+        except (ValueError, KeyError):
+            crops.append({
+                'name': crop_data.get('name', 'Unknown Crop'),
+                'type': crop_data.get('type', ''),
+                'days_old': 30
+            })
+    return crops
+
+def translate_with_gemini(texts, language):
+    """Translate a batch of strings with one Gemini call, returning them in the same order"""
+    prompt = f"""
+Translate each string in this JSON array into {SUPPORTED_LANGUAGES[language]} for a farmer. Keep emojis, numbers and units unchanged.
+Respond with only a JSON array of the translated strings, in the same order.
+
+{json.dumps(texts, ensure_ascii=False)}
+"""
+    response_text = generate_with_gemini(prompt).strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:-3]
+    elif response_text.startswith('```'):
+        response_text = response_text[3:-3]
+
+    translated = json.loads(response_text)
+    if not isinstance(translated, list) or not all(isinstance(text, str) for text in translated):
+        raise ValueError("Invalid translation format")
+    return translated
+
+# Suggestions are generated once in English (shared between users through the
+# Gemini prompt cache) and translated per language through this memo
+translations = TranslationMemo(shared_cache, translate_with_gemini)
+
+def language_override():
+    """Language code from ?lang= ('' for English), or None when absent; raises ValueError if unsupported"""
+    if 'lang' not in request.args:
+        return None
+    return normalize_language(request.args.get('lang')) or ''
+
+def profile_language(profile_doc):
+    """Supported language from a farmer profile, else None (English)"""
+    try:
+        return normalize_language(profile_doc.to_dict().get('language')) if profile_doc and profile_doc.exists else None
+    except ValueError:
+        return None
 
+def user_language(user_id, override):
+    """Target language from the ?lang= override, else the farmer profile (read only when needed)"""
+    if override is not None:
+        return override or None
+    return profile_language(db.collection('users').document(user_id).collection('profile').document('info').get())
+
+def localize_suggestions(suggestions, language):
+    """Return (suggestions, language served or None for English)"""
+    texts, served = translations.translate([suggestion.get('text', '') for suggestion in suggestions], language)
+    return [{**suggestion, 'text': text} for suggestion, text in zip(suggestions, texts)], served
+
+def localize_daily_suggestion(suggestion, language):
+    """Return (suggestion, language served or None for English)"""
+    (heading, body), served = translations.translate([suggestion['heading'], suggestion['body']], language)
+    return {**suggestion, 'heading': heading, 'body': body}, served
+
+def load_daily_suggestion(crops, lat, lon, attempt):
+    """suggestion_store loader: a suggestion made without weather is served, but not kept as the last good one"""
+    weather_data = attempt['weather'] = get_weather_data(lat, lon)
+    suggestion = request_daily_suggestion(crops, weather_data)
+    if weather_data is None:
+        raise Degraded(suggestion)
+    return suggestion
+
+def load_farming_suggestions(crops, lat, lon, attempt):
+    """suggestion_store loader: suggestions made without weather are served, but not kept as the last good ones"""
+    weather_data = attempt['weather'] = get_weather_data(lat, lon)
+    suggestions = request_farming_suggestions(crops, weather_data)
+    if weather_data is None:
+        raise Degraded(suggestions)
+    return suggestions
 
+def fallback_weather(attempt, lat, lon):
+    """Weather the loader already fetched (even None after a failure); fetched here only if it never got that far"""
+    return attempt['weather'] if 'weather' in attempt else get_weather_data(lat, lon)
 
+def daily_suggestion_for(user_id, crops, lat, lon):
+    """Return (suggestion, age_seconds) for a user's crops at a location"""
+    # Serve the last good suggestion for this user, crops and tile while a fresh one is generated
+    cache_key = ('daily', user_id, weather_tile(lat, lon), crops_fingerprint(crops))
+    attempt = {}
+    try:
+        return suggestion_store.get(cache_key, lambda: load_daily_suggestion(crops, lat, lon, attempt))
+    except Exception as e:
+        # Gemini already failed for this request, so fall back locally instead of calling it again
+        print(f"Error generating daily suggestion: {e}")
+        return generate_fallback_daily_suggestion(crops, fallback_weather(attempt, lat, lon)), 0
 
 #Suggestion endpoints-----------------------------------------------------------------------------------------------------------------
 
 @app.route('/getDailySuggestion', methods=['GET'])
+@idempotent(suggestion_request_key)
 def get_daily_suggestion():
     try:
         user_id = request.args.get("userId")
@@ -779,40 +1704,28 @@ def get_daily_suggestion():
         if not validate_user_id(user_id):
             return jsonify({"error": "Valid userId is required"}), 400
 
-        update_user_activity(user_id)
+        try:
+            lang_override = language_override()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        update_user_activity(user_id, *request_coordinates())
 
         # Get crops from Firebase
-        crops_ref = db.collection("users").document(user_id).collection("crops").stream()
-        crops = []
-        current_date = datetime.now()
-        
-        for doc in crops_ref:
-            crop_data = doc.to_dict()
-            try:
-                sowed_date = datetime.strptime(crop_data.get('sowedDate', ''), '%Y-%m-%d')
-                days_old = (current_date - sowed_date).days
-                crops.append({
-                    'name': crop_data.get('name', 'Unknown Crop'),
-                    'type': crop_data.get('type', ''),
-                    'days_old': days_old
-                })
-            except (ValueError, KeyError):
-                crops.append({
-                    'name': crop_data.get('name', 'Unknown Crop'),
-                    'type': crop_data.get('type', ''),
-                    'days_old': 30
-                })
+        crops_ref = user_crop_docs(user_id)
+        crops = daily_suggestion_crops(crops_ref)
 
         if not crops:
             return jsonify({"error": "No crops found for this user. Please add crops first."}), 404
 
-        weather_data = get_weather_data(lat, lon)
-
-        suggestion = generate_daily_suggestion_with_gemini(crops, weather_data)
+        suggestion, data_age = daily_suggestion_for(user_id, crops, lat, lon)
+        suggestion, language = localize_daily_suggestion(suggestion, user_language(user_id, lang_override))
 
         return jsonify({
             "success": True,
-            "suggestion": suggestion
+            "suggestion": suggestion,
+            "language": language or 'en',
+            "dataAge": int(data_age)
         })
 
     except Exception as e:
@@ -822,6 +1735,7 @@ def get_daily_suggestion():
         }), 500
 
 @app.route('/getSuggestions', methods=['GET'])
+@idempotent(suggestion_request_key)
 def get_suggestions():
     try:
         user_id = request.args.get("userId")
@@ -832,9 +1746,14 @@ def get_suggestions():
         if not validate_user_id(user_id):
             return jsonify({"error": "Valid userId is required"}), 400
 
-        update_user_activity(user_id)
+        try:
+            lang_override = language_override()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        update_user_activity(user_id, *request_coordinates())
 
-        crops_ref = db.collection("users").document(user_id).collection("crops").stream()
+        crops_ref = user_crop_docs(user_id)
         crops = []
         current_date = datetime.now()
         
@@ -865,9 +1784,18 @@ def get_suggestions():
         if not crops:
             return jsonify({"error": "No crops found for this user. Please add crops first."}), 404
 
-        weather_data = get_weather_data(lat, lon)
+        cache_key = ('suggestions', user_id, weather_tile(lat, lon), crops_fingerprint(crops))
+        attempt = {}
+        try:
+            suggestions, data_age = suggestion_store.get(
+                cache_key, lambda: load_farming_suggestions(crops, lat, lon, attempt)
+            )
+        except Exception as e:
+            print(f"Error generating suggestions with Gemini: {e}")
+            suggestions = generate_fallback_suggestions(crops, fallback_weather(attempt, lat, lon))
+            data_age = 0
 
-        suggestions = generate_farming_suggestions_with_gemini(crops, weather_data)
+        suggestions, language = localize_suggestions(suggestions, user_language(user_id, lang_override))
 
         formatted_suggestions = {}
         suggestion_keys = ['first', 'second', 'third', 'fourth']
@@ -878,7 +1806,9 @@ def get_suggestions():
 
         return jsonify({
             "success": True,
-            "suggestions": formatted_suggestions
+            "suggestions": formatted_suggestions,
+            "language": language or 'en',
+            "dataAge": int(data_age)
         })
 
     except Exception as e:
@@ -897,6 +1827,113 @@ def get_suggestions():
 
 
 
+# Dashboard endpoint---------------------------------------------------------------------------------------------------
+# Seconds from the start of the request after which a section is reported as timed out
+DASHBOARD_DEADLINES = {'profile': 3, 'crops': 3, 'weather': 5, 'dailySuggestion': 8}
+dashboard_pool = ThreadPoolExecutor(max_workers=16)
+
+def dashboard_section(future, deadline, build):
+    """Turn a future into a section payload, degrading to an error entry on failure or timeout"""
+    try:
+        result = future.result(timeout=max(0, deadline - time.monotonic()))
+        return build(result)
+    except FutureTimeout:
+        return {'success': False, 'error': 'Timed out'}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+@app.route('/dashboard', methods=['GET'])
+def dashboard():
+    try:
+        user_id = request.args.get("userId")
+        lat = request.args.get('lat', 27.1767, type=float)
+        lon = request.args.get('lon', 78.0081, type=float)
+
+        # Validate user_id
+        if not validate_user_id(user_id):
+            return jsonify({"error": "Valid userId is required"}), 400
+
+        try:
+            lang_override = language_override()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        started = time.monotonic()
+        deadlines = {name: started + seconds for name, seconds in DASHBOARD_DEADLINES.items()}
+
+        # One activity write for the whole screen instead of one per endpoint
+        update_user_activity(user_id, *request_coordinates())
+
+        user_ref = db.collection("users").document(user_id)
+        profile_ref = user_ref.collection("profile").document("info")
+        profile_future = dashboard_pool.submit(tracer.wrap(lambda: next(iter(db.get_all([profile_ref])), None)))
+        crops_future = dashboard_pool.submit(tracer.wrap(lambda: list(user_ref.collection("crops").stream())))
+        weather_future = dashboard_pool.submit(tracer.wrap(get_weather_data_with_age), lat, lon)
+
+        def build_profile(profile_doc):
+            if not profile_doc or not profile_doc.exists:
+                return {'success': False, 'error': 'Profile not found'}
+            return {'success': True, 'profile': profile_doc.to_dict()}
+
+        def build_weather(result):
+            weather_data, data_age = result
+            if not weather_data:
+                return {'success': False, 'error': 'Failed to fetch weather data'}
+            return {'success': True, 'weather': weather_data, 'location': {'lat': lat, 'lon': lon}, 'dataAge': int(data_age)}
+
+        def daily_suggestion(crop_docs):
+            # Reuses the crop scan above instead of streaming the collection again
+            crops = daily_suggestion_crops(crop_docs)
+            if not crops:
+                return None
+            # Let the parallel weather fetch fill weather_store so the prompt does not fetch it again
+            try:
+                weather_future.result(timeout=max(0, deadlines['weather'] - time.monotonic()))
+            except Exception:
+                pass
+            suggestion, data_age = daily_suggestion_for(user_id, crops, lat, lon)
+
+            language = lang_override or None
+            if lang_override is None:
+                try:
+                    language = profile_language(
+                        profile_future.result(timeout=max(0, deadlines['profile'] - time.monotonic()))
+                    )
+                except Exception:
+                    pass
+            suggestion, language = localize_daily_suggestion(suggestion, language)
+            return suggestion, language, data_age
+
+        def build_suggestion(result):
+            if not result:
+                return {'success': False, 'error': 'No crops found for this user. Please add crops first.'}
+            suggestion, language, data_age = result
+            return {'success': True, 'suggestion': suggestion, 'language': language or 'en', 'dataAge': int(data_age)}
+
+        crops_section = dashboard_section(
+            crops_future, deadlines['crops'], lambda docs: {'success': True, 'crops': [format_crop(doc) for doc in docs]}
+        )
+        if crops_section['success']:
+            suggestion_future = dashboard_pool.submit(tracer.wrap(daily_suggestion), crops_future.result())
+            suggestion_section = dashboard_section(suggestion_future, deadlines['dailySuggestion'], build_suggestion)
+        else:
+            suggestion_section = {'success': False, 'error': 'Crops unavailable'}
+
+        return jsonify({
+            'success': True,
+            'userId': user_id,
+            'profile': dashboard_section(profile_future, deadlines['profile'], build_profile),
+            'crops': crops_section,
+            'weather': dashboard_section(weather_future, deadlines['weather'], build_weather),
+            'dailySuggestion': suggestion_section
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+
+
 # Chat history endpoints---------------------------------------------------------------------------------------------------
 @app.route('/getChats', methods=['GET'])
 def get_chats():
@@ -909,21 +1946,19 @@ def get_chats():
 
         update_user_activity(user_id)
             
-        chats = db.collection("users").document(user_id).collection("chats")\
-                .order_by("createdAt", direction=firestore.Query.DESCENDING).stream()
+        # Only the summary fields, not the message arrays
+        chats = list(db.collection("users").document(user_id).collection("chats")\
+                .select(CHAT_SUMMARY_FIELDS)\
+                .order_by("createdAt", direction=firestore.Query.DESCENDING).stream())
+
+        etag = etag_for(user_id, [(chat.id, chat.update_time) for chat in chats])
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        chat_list = []
-        for chat in chats:
-            data = chat.to_dict()
-            created_at = data.get("createdAt")
-            chat_list.append({
-                "chatId": chat.id,
-                "lastMessage": data.get("lastMessage", ""),
-                "createdAt": created_at.isoformat() if created_at else None,
-                "updatedAt": data.get("updatedAt", created_at).isoformat() if data.get("updatedAt") else None
-            })
+        chat_list = [format_chat_summary(chat) for chat in chats]
             
-        return jsonify({"chats": chat_list, "userId": user_id})
+        return json_with_etag({"chats": chat_list, "userId": user_id}, etag)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -947,20 +1982,29 @@ def get_chat():
         if not chat_doc.exists:
             return jsonify({"error": "Chat not found"}), 404
 
+        etag = etag_for(user_id, chat_id, chat_doc.update_time)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         chat_data = chat_doc.to_dict()
-        messages = chat_data.get("messages", [])
+        if chat_data.get("archived"):
+            messages = archived_messages(chat_id, chat_data)
+        else:
+            messages = chat_data.get("messages", [])
 
         for msg in messages:
-            if "timestamp" in msg:
+            # Archived messages already carry ISO strings
+            if "timestamp" in msg and not isinstance(msg["timestamp"], str):
                 msg["timestamp"] = msg["timestamp"].isoformat()
 
-        return jsonify({
+        return json_with_etag({
             "chatId": chat_id,
             "userId": user_id,
             "createdAt": chat_data.get("createdAt").isoformat() if chat_data.get("createdAt") else None,
             "updatedAt": chat_data.get("updatedAt").isoformat() if chat_data.get("updatedAt") else None,
             "messages": messages
-        })
+        }, etag)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -979,11 +2023,9 @@ def delete_all_chats():
 
         update_user_activity(user_id)
 
-        chat_docs = db.collection("users").document(user_id).collection("chats").stream()
-        deleted_count = 0
-        for doc in chat_docs:
-            doc.reference.delete()
-            deleted_count += 1
+        writes, deleted_count = delete_chats_writes(user_id)
+        commit_writes(writes)
+        delete_chat_archives(user_id)
 
         return jsonify({
             "success": True,
@@ -995,7 +2037,179 @@ def delete_all_chats():
     
 
 
+# Batch endpoint------------------------------------------------------------------------------------------------------------
+# /batch replays an offline queue in one call. Semantics:
+#   * Operations are applied in list order, each one's writes after the previous one's.
+#     Reads they depend on (existing chats, whether the profile exists) happen up front.
+#   * Invalid operations are reported as "invalid" and skipped; the others still run.
+#   * Writes are packed into as few Firestore batches as possible. A batch is atomic and
+#     holds whole operations, except a deleteAllChats too large for one batch, which gets
+#     batches of its own.
+#   * If a batch fails, its operations are retried one at a time, in order, so only the
+#     operations that fail on their own (e.g. updateCrop on a deleted crop) are "failed".
+#   * "ok" means the operation's writes are committed; later operations never undo it.
+#     A failed oversized deleteAllChats may have deleted some chats; it is safe to resend.
+BATCH_MAX_OPERATIONS = 100
+
+def plan_batch_operation(user_id, operation):
+    """Validate one /batch operation and return (writes, result fields), raising ValueError if invalid"""
+    op = operation.get('op')
+    if op == 'addCrop':
+        crop_data_list = operation.get('cropData')
+        if not crop_data_list or not isinstance(crop_data_list, list) or not all(isinstance(c, dict) for c in crop_data_list):
+            raise ValueError("cropData must be a non-empty list")
+        writes, added_crops = add_crop_writes(user_id, crop_data_list)
+        return writes, {"cropsAdded": added_crops}
+    if op == 'updateCrop':
+        crop_id, crop_data = operation.get('cropId'), operation.get('cropData')
+        if not crop_id or not crop_data or not isinstance(crop_data, dict):
+            raise ValueError("Missing cropId or cropData")
+        return update_crop_writes(user_id, crop_id, crop_data), {"cropId": crop_id}
+    if op == 'deleteCrop':
+        crop_id = operation.get('cropId')
+        if not crop_id:
+            raise ValueError("Missing cropId")
+        return delete_crop_writes(user_id, crop_id), {"cropId": crop_id}
+    if op == 'updateProfile':
+        updates = operation.get('updates')
+        if not updates or not isinstance(updates, dict):
+            raise ValueError("updates are required")
+        return profile_writes(user_id, updates), {}
+    if op == 'deleteAllChats':
+        writes, deleted_count = delete_chats_writes(user_id)
+        return writes, {"deletedCount": deleted_count}
+    raise ValueError(f"Unknown op: {op}")
+
+def batch_chunks(planned):
+    """Group (index, writes) pairs into batches of whole operations, splitting only oversized ones"""
+    chunks, current, size = [], [], 0
+    for index, writes in planned:
+        if len(writes) > BATCH_WRITE_LIMIT:
+            if current:
+                chunks.append(current)
+                current, size = [], 0
+            for start in range(0, len(writes), BATCH_WRITE_LIMIT):
+                chunks.append([(index, writes[start:start + BATCH_WRITE_LIMIT])])
+            continue
+        if size + len(writes) > BATCH_WRITE_LIMIT:
+            chunks.append(current)
+            current, size = [], 0
+        current.append((index, writes))
+        size += len(writes)
+    if current:
+        chunks.append(current)
+    return chunks
+
+@app.route('/batch', methods=['POST'])
+@idempotent()
+def batch_operations():
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+
+        user_id = data.get('user_id') or data.get('userId')
+        operations = data.get('operations')
+
+        # Validate user_id
+        if not validate_user_id(user_id):
+            return jsonify({"error": "Valid userId is required"}), 400
+
+        if not operations or not isinstance(operations, list):
+            return jsonify({"error": "operations must be a non-empty list"}), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return jsonify({"error": f"At most {BATCH_MAX_OPERATIONS} operations per batch"}), 400
+
+        update_user_activity(user_id)
+
+        results, planned, fields_by_index = [], [], {}
+        fallbacks = {}   # index -> writes to commit instead if the operation's own hit a missing document
+        for index, operation in enumerate(operations):
+            operation = operation if isinstance(operation, dict) else {}
+            result = {"index": index, "op": operation.get('op')}
+            if operation.get('id') is not None:
+                result["id"] = operation['id']
+            try:
+                writes, fields = plan_batch_operation(user_id, operation)
+            except ValueError as e:
+                result.update({"status": "invalid", "error": str(e)})
+            else:
+                result["status"] = "pending"
+                fields_by_index[index] = fields
+                planned.append((index, writes))
+                if operation['op'] == 'updateProfile':
+                    # Like /update_farmer_profile: a farmer without a profile yet gets one created
+                    fallbacks[index] = profile_writes(user_id, operation['updates'], create=True)
+            results.append(result)
+
+        commits = 0
+        for chunk in batch_chunks(planned):
+            if any(results[index]["status"] == "failed" for index, _ in chunk):
+                continue   # a later piece of an oversized operation that already failed
+            try:
+                batch = db.batch()
+                for _, writes in chunk:
+                    stage_writes(batch, writes)
+                batch.commit()
+                commits += 1
+                for index, _ in chunk:
+                    results[index].update({"status": "ok", **fields_by_index[index]})
+            except Exception as e:
+                if len(chunk) > 1:
+                    print(f"⚠️  Batch of {len(chunk)} operations failed, retrying one at a time: {e}")
+                for index, writes in chunk:
+                    try:
+                        if len(chunk) > 1:
+                            commits += commit_with_fallback(writes, fallbacks.get(index))
+                        elif isinstance(e, NotFound) and index in fallbacks:
+                            commits += commit_writes(fallbacks[index])
+                        else:
+                            raise e   # it already failed on its own
+                        results[index].update({"status": "ok", **fields_by_index[index]})
+                    except Exception as op_error:
+                        results[index].update({"status": "failed", "error": str(op_error)})
+
+        for result in results:
+            if result["op"] == 'deleteAllChats' and result["status"] == "ok":
+                delete_chat_archives(user_id)
+                break
+
+        return jsonify({
+            "success": all(result["status"] == "ok" for result in results),
+            "userId": user_id,
+            "results": results,
+            "batchesCommitted": commits
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
 #User Profile and info endpoints---------------------------------------------------------------------------------------------------
+DEFAULT_PROFILE_FIELDS = {
+    'name': '',
+    'phone': '',
+    'location': '',
+    'language': '',
+    'profilePhoto': ''
+}
+
+def profile_writes(user_id, updates, create=False):
+    """Writes for a profile update: update(), so dotted keys reach into nested maps, or with create a new profile"""
+    profile_ref = db.collection('users').document(user_id).collection('profile').document('info')
+    writes = []
+    # A "lat,lon" farm location places the user in a weather alert tile
+    coordinates = parse_coordinates(updates.get('location', ''))
+    if coordinates:
+        fields = geo_fields(*coordinates)
+        writes.append(("merge", db.collection('users').document(user_id), fields))
+        writes += tile_index_writes(user_id, fields["geoTile"])
+    if create:
+        writes.append(("set", profile_ref, {**DEFAULT_PROFILE_FIELDS, **updates}))
+    else:
+        writes.append(("update", profile_ref, updates))
+    return writes
+
 @app.route('/get_farmer_profile', methods=['GET'])
 def get_farmer_profile():
     try:
@@ -1011,18 +2225,23 @@ def get_farmer_profile():
         if not profile_doc.exists:
             return jsonify({'message': 'Profile not found'}), 404
 
+        etag = etag_for(user_id, field, profile_doc.update_time)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         profile_data = profile_doc.to_dict()
 
         if field:
             if field in profile_data:
-                return jsonify({field: profile_data[field]}), 200
+                return json_with_etag({field: profile_data[field]}, etag), 200
             else:
                 return jsonify({'error': f'Field "{field}" not found'}), 404
 
-        return jsonify({
+        return json_with_etag({
             'userId': user_id,
             'profile': profile_data
-        }), 200
+        }, etag), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1038,22 +2257,13 @@ def update_farmer_profile():
         if not user_id or not updates:
             return jsonify({'error': 'userId and updates are required'}), 400
 
-        profile_ref = db.collection('users').document(user_id).collection('profile').document('info')
-
-        # Checking if profile exists
-        if not profile_ref.get().exists:
-            default_fields = {
-                'name': '',
-                'phone': '',
-                'location': '',
-                'language': '',
-                'profilePhoto': ''
-            }
-            default_fields.update(updates)
-            profile_ref.set(default_fields)
+        # Update first and only create on NotFound, instead of paying a read on every call
+        try:
+            commit_writes(profile_writes(user_id, updates))
+        except NotFound:
+            commit_writes(profile_writes(user_id, updates, create=True))
             return jsonify({'message': 'Profile did not exist. Created new profile.'}), 201
 
-        profile_ref.update(updates)
         return jsonify({'message': 'Profile updated successfully'}), 200
 
     except Exception as e:
@@ -1079,8 +2289,11 @@ def home():
             'POST /analyze_image': 'Analyze plant images (requires user_id)',
             'GET /weather': 'Get weather data',
             'GET /getSuggestions': 'Get weather-based farming suggestions (requires userId)',
+            'GET /dashboard': 'Profile, crops, weather and daily suggestion in one call (requires userId)',
             'POST /addCrop': 'Add crops (requires user_id)',
             'GET /getCrops': 'Get crops (requires userId)',
+            'GET /sync': 'Crops and chats changed since a sync token (requires userId)',
+            'POST /batch': 'Replay queued crop, profile and chat operations in one call (requires userId)',
             'GET /getChats': 'Get chat history (requires userId)',
             'DELETE /deleteAllChats': 'Delete all chats (requires userId)'
         }
@@ -1094,6 +2307,224 @@ def health():
         'weather_api': 'connected' if OPENWEATHER_API_KEY else 'missing'
     })
 
+# Debug endpoints (require X-Debug-Token)----------------------------------------------------------------------------------
+@app.route('/debug/caches', methods=['GET'])
+@require_debug_token
+def debug_caches():
+    return jsonify({'success': True, 'pid': os.getpid(), **cache_manager.stats()})
+
+@app.route('/debug/semantic_cache', methods=['GET', 'DELETE'])
+@require_debug_token
+def debug_semantic_cache():
+    if request.method == 'DELETE':
+        removed = semantic_cache.purge(request.args.get('language'), request.args.get('contains'))
+        return jsonify({'success': True, 'removed': removed})
+    return jsonify({'success': True, 'partitions': semantic_cache.stats()})
+
+@app.route('/debug/plant_gate', methods=['GET'])
+@require_debug_token
+def debug_plant_gate():
+    if not plant_gate:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'thresholds': {
+            'acceptGreen': plant_gate.accept_green,
+            'minLeafDetail': plant_gate.min_leaf_detail,
+            'rejectVegetation': plant_gate.reject_vegetation,
+            'rejectBlue': plant_gate.reject_blue
+        },
+        **plant_gate.stats()
+    })
+
+@app.route('/debug/translations', methods=['GET'])
+@require_debug_token
+def debug_translations():
+    return jsonify({'success': True, 'languages': translations.stats()})
+
+@app.route('/debug/traces', methods=['GET'])
+@require_debug_token
+def debug_traces():
+    kind = request.args.get('kind', 'slow')
+    if kind not in ('slow', 'sampled'):
+        return jsonify({'error': 'kind must be "slow" or "sampled"'}), 400
+    response = jsonify({
+        'kind': kind,
+        'slowThresholdSeconds': tracer.slow_threshold,
+        'sampleRate': tracer.sample_rate,
+        'traces': tracer.traces(kind)
+    })
+    if request.args.get('download'):
+        response.headers['Content-Disposition'] = f'attachment; filename="traces-{kind}.json"'
+    return response
+
+# Sampling profiler: idle until asked, then one background session per worker.
+# Sessions live in the worker that started them (see "pid" in the responses).
+profile_sessions = ProfileSessions()
+
+@app.route('/debug/firestore', methods=['GET'])
+@require_debug_token
+def debug_firestore():
+    return jsonify({
+        'pid': os.getpid(),
+        'strict': FIRESTORE_BUDGET_STRICT,
+        'budgets': FIRESTORE_BUDGETS,
+        'endpoints': firestore_metrics.snapshot()
+    })
+
+@app.route('/debug/profile', methods=['GET'])
+@require_debug_token
+def debug_profile():
+    mode = request.args.get('mode', 'cpu')
+    if mode not in ('cpu', 'heap'):
+        return jsonify({'error': 'mode must be "cpu" or "heap"'}), 400
+    seconds = request.args.get('seconds', 10, type=float)
+
+    session_id = profile_sessions.start(mode, seconds)
+    if not session_id:
+        return jsonify({'error': 'A profile is already running in this worker', 'pid': os.getpid()}), 409
+    # Never block here: a sync worker would serve nothing else while it samples itself.
+    # Poll the result URL instead; it only resolves on this worker (see "pid").
+    return jsonify({
+        'success': True,
+        'id': session_id,
+        'pid': os.getpid(),
+        'result': f'/debug/profile/{session_id}'
+    }), 202
+
+@app.route('/debug/profile/<session_id>', methods=['GET'])
+@require_debug_token
+def debug_profile_result(session_id):
+    session = profile_sessions.result(session_id)
+    if not session:
+        return jsonify({'error': 'Unknown profile in this worker', 'pid': os.getpid()}), 404
+    if session['status'] == 'running':
+        return jsonify({'status': 'running', 'pid': os.getpid()}), 202
+    if session['status'] == 'failed':
+        return jsonify({'status': 'failed', 'error': session['output']}), 500
+    # Collapsed stacks: "frame;frame;frame count" (samples for cpu, bytes grown for heap)
+    response = app.response_class(session['output'], mimetype='text/plain')
+    response.headers['X-Profile-Mode'] = session['mode']
+    return response
+
+@app.route('/debug/archive_chats', methods=['POST'])
+@require_debug_token
+def debug_archive_chats():
+    user_id = request.args.get('userId')
+    if not validate_user_id(user_id):
+        return jsonify({'error': 'Valid userId is required'}), 400
+    days = request.args.get('days', CHAT_ARCHIVE_AFTER_DAYS, type=int)
+    try:
+        report = chat_archive.archive_cold_chats(db, user_id, chat_blob_store, days)
+        return jsonify({'success': True, 'report': report})
+    except chat_archive.ArchiveNotConfigured as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.cli.command('archive-chats')
+@click.option('--days', default=CHAT_ARCHIVE_AFTER_DAYS, help='Archive chats untouched for this many days')
+def archive_chats_command(days):
+    """Archive cold chats for every user and print what was reclaimed"""
+    if chat_blob_store is None or not chat_blob_store.durable:
+        raise click.ClickException("Set CHAT_ARCHIVE_DIR to durable storage outside the temp dir before archiving")
+    totals = {'users': 0, 'documentsArchived': 0, 'bytesReclaimed': 0, 'blobBytes': 0, 'skipped': 0}
+    for user_doc in db.collection("users").stream():
+        try:
+            report = chat_archive.archive_cold_chats(db, user_doc.id, chat_blob_store, days)
+        except Exception as e:
+            print(f"❌ Archiving chats for {user_doc.id} failed: {e}")
+            continue
+        totals['users'] += 1
+        for field in ('documentsArchived', 'bytesReclaimed', 'blobBytes', 'skipped'):
+            totals[field] += report[field]
+    print(f"✅ Archived {totals['documentsArchived']} chat(s) for {totals['users']} user(s), "
+          f"reclaimed {totals['bytesReclaimed']} bytes into {totals['blobBytes']} compressed bytes "
+          f"({totals['skipped']} skipped)")
+
+def run_weather_alerts():
+    """Fetch one forecast per occupied geo tile and write threshold alerts to every user in it"""
+    # One read per occupied tile, however many users there are
+    users_by_tile = {}
+    for tile_doc in db.collection("geoTiles").stream():
+        members = (tile_doc.to_dict() or {}).get("members")
+        if members:
+            users_by_tile[tile_doc.id] = members
+    tiles = sorted(users_by_tile)
+
+    def tile_forecast(tile):
+        weather, _ = get_weather_data_with_age(*geohash_center(tile))
+        return (weather or {}).get('daily') or []
+
+    with ThreadPoolExecutor(max_workers=ALERT_FETCH_WORKERS) as pool:
+        daily_by_tile = dict(zip(tiles, pool.map(tile_forecast, tiles)))
+    alerts = evaluate_alerts(tiles, daily_by_tile)
+
+    # The index can still list users who have since moved away; check the members of
+    # alerted tiles only, the users about to be written to anyway, and drop the strays
+    for tile in alerts:
+        members = users_by_tile[tile]
+        user_refs = [db.collection("users").document(user_id) for user_id in members]
+        current = [doc.id for doc in db.get_all(user_refs, field_paths=["geoTile"])
+                   if doc.exists and (doc.to_dict() or {}).get("geoTile") == tile]
+        moved = [user_id for user_id in members if user_id not in set(current)]
+        if moved:
+            db.collection("geoTiles").document(tile).set({"members": firestore.ArrayRemove(moved)}, merge=True)
+        users_by_tile[tile] = current
+
+    written = 0
+    batch = db.batch()
+    issued_at = datetime.now(timezone.utc)
+    for tile, tile_alerts in alerts.items():
+        documents = [alert_document(alert) for alert in tile_alerts]
+        for user_id in users_by_tile[tile]:
+            for document in documents:
+                # One document per kind and day, so re-running the job overwrites instead of duplicating
+                alert_ref = (db.collection("users").document(user_id)
+                             .collection("alerts").document(f"{document['kind']}-{document['date']}"))
+                batch.set(alert_ref, {**document, 'tile': tile, 'issuedAt': issued_at})
+                written += 1
+                if written % 500 == 0:
+                    batch.commit()
+                    batch = db.batch()
+    if written % 500:
+        batch.commit()
+
+    return {
+        'users': sum(len(user_ids) for user_ids in users_by_tile.values()),
+        'tiles': len(tiles),
+        'tilesWithoutForecast': sum(1 for tile in tiles if not daily_by_tile[tile]),
+        'tilesAlerted': len(alerts),
+        'alertsWritten': written
+    }
+
+@app.cli.command('index-geo-tiles')
+def index_geo_tiles_command():
+    """List every user with a geoTile in the geoTiles index (once, for users located before it existed)"""
+    writes = []
+    for user_doc in db.collection("users").select(["geoTile"]).stream():
+        tile = (user_doc.to_dict() or {}).get("geoTile")
+        if tile:
+            writes += tile_index_writes(user_doc.id, tile)
+    commit_writes(writes)
+    print(f"✅ Indexed {len(writes)} user(s) by geo tile")
+
+@app.route('/debug/weather_alerts', methods=['POST'])
+@require_debug_token
+def debug_weather_alerts():
+    try:
+        return jsonify({'success': True, 'report': run_weather_alerts()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.cli.command('send-weather-alerts')
+def send_weather_alerts_command():
+    """Check the forecast for every occupied tile and write heavy rain, heat and frost alerts"""
+    report = run_weather_alerts()
+    print(f"✅ Wrote {report['alertsWritten']} alert(s) for {report['tilesAlerted']} of {report['tiles']} tile(s) "
+          f"covering {report['users']} user(s) ({report['tilesWithoutForecast']} tile(s) without forecast)")
+
 if __name__ == '__main__':
     print("🌾 Agricultural Advisory System (Login System Integration)")
     print("=" * 60)
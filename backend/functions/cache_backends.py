@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class CacheBackend(ABC):
+    """Key/value cache with TTLs; values must be JSON-serializable"""
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Drop key if present"""
+
+    @abstractmethod
+    def get_or_compute(self, key, ttl, compute):
+        """Return the cached value or store compute()'s result, computing at most once at a time per key"""
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU cache, for single-worker development"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.account = None             # CacheAccount when registered with a CacheManager
+
+    def get(self, key):
+        value = self._peek(key)
+        if self.account:
+            if value is not None:
+                self.account.hit(key)
+            else:
+                self.account.miss()
+        return value
+
+    def _peek(self, key):
+        """get() without counting a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] < time.time():
+                del self._entries[key]
+                if self.account:
+                    self.account.removed(key)
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ttl):
+        dropped = []
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                dropped.append(self._entries.popitem(last=False)[0])
+        if self.account:
+            for old_key in dropped:
+                self.account.removed(old_key)
+            self.account.added(key, value)
+
+    def delete(self, key):
+        self.discard(key)
+        if self.account:
+            self.account.removed(key, evicted=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_or_compute(self, key, ttl, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Already counted as a miss above; only see whether another thread filled it meanwhile
+            value = self._peek(key)
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache in a WAL-mode SQLite file shared by every worker on the host and kept across restarts"""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, lease_ttl=60, evict_every=50):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lease_ttl = lease_ttl
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT, size INTEGER, expires_at REAL, accessed_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires_at REAL)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork (gunicorn --preload)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if not row or row[1] < now:
+            return None
+        # Recency only matters at eviction granularity, so skip most access-time writes
+        if now - row[2] > 60:
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        data = json.dumps(value)
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data), now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def evict(self):
+        """Drop expired rows, then least recently used rows until the file is under max_bytes"""
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+    def _acquire_lease(self, key):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases (key, expires_at) VALUES (?, ?)", (key, now + self.lease_ttl))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_or_compute(self, key, ttl, compute):
+        deadline = time.time() + self.lease_ttl
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self._acquire_lease(key) or time.time() > deadline:
+                break
+            # Another worker is computing this key; wait for its result
+            time.sleep(0.1)
+        try:
+            value = compute()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            self._connection().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+
+class RedisBackend(CacheBackend):
+    """Cache on a local Redis-protocol server; size bounds come from its maxmemory policy"""
+
+    def __init__(self, url, prefix='agrihive:', lease_ttl=60):
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.lease_ttl = lease_ttl
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return json.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def get_or_compute(self, key, ttl, compute):
+        lease_key = f"{self.prefix}lease:{key}"
+        deadline = time.time() + self.lease_ttl
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self.client.set(lease_key, 1, nx=True, ex=self.lease_ttl) or time.time() > deadline:
+                break
+            time.sleep(0.1)
+        try:
+            value = compute()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            self.client.delete(lease_key)
+
+
+def make_cache_backend():
+    """Build the backend selected by CACHE_BACKEND (sqlite, redis or memory)"""
+    kind = os.environ.get('CACHE_BACKEND', 'sqlite')
+    if kind == 'redis':
+        return RedisBackend(os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    if kind == 'memory':
+        return MemoryBackend()
+    max_mb = int(os.environ.get('CACHE_MAX_MB', 256))
+    return SQLiteBackend(os.environ.get('CACHE_PATH', '/tmp/agrihive-cache.db'), max_bytes=max_mb * 1024 * 1024)
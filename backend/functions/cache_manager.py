@@ -0,0 +1,141 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def approx_size(value):
+    """Rough in-memory footprint of a cached value in bytes"""
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(key) + approx_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+
+class CacheAccount:
+    """One registered cache's entries as the manager sees them: key -> (bytes, last used)"""
+
+    def __init__(self, manager, name, cost, evict):
+        self.manager = manager
+        self.name = name
+        self.cost = cost        # relative cost to recompute one entry
+        self.evict = evict      # callable(key) that drops the entry from the cache
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.reserved = 0       # fixed allocations: reported, but outside the eviction budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit(self, key=None):
+        with self.manager._lock:
+            self.hits += 1
+            entry = self.entries.get(key)
+            if entry:
+                self.entries[key] = (entry[0], time.monotonic())
+                self.entries.move_to_end(key)
+
+    def miss(self):
+        with self.manager._lock:
+            self.misses += 1
+
+    def added(self, key, value):
+        """Record a stored value; call outside the cache's own lock, since it may evict from other caches"""
+        size = approx_size(value)
+        with self.manager._lock:
+            old = self.entries.pop(key, None)
+            self.bytes += size - (old[0] if old else 0)
+            self.entries[key] = (size, time.monotonic())
+        self.manager.enforce()
+
+    def removed(self, key, evicted=True):
+        """Record an entry the cache dropped by itself (its own LRU bound or expiry)"""
+        with self.manager._lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.bytes -= old[0]
+                self.evictions += int(evicted)
+
+    def reserve(self, size):
+        with self.manager._lock:
+            self.reserved += size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'reservedBytes': self.reserved,
+            'cost': self.cost,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRatio': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions
+        }
+
+
+class CacheManager:
+    """Keeps the combined size of every registered in-process cache under one per-worker byte budget"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.accounts = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, cost, evict):
+        """Return the CacheAccount a cache reports its entries, hits and misses to"""
+        account = CacheAccount(self, name, cost, evict)
+        with self._lock:
+            self.accounts[name] = account
+        return account
+
+    def total_bytes(self):
+        """Evictable bytes across caches; reservations are excluded since eviction cannot free them"""
+        with self._lock:
+            return sum(account.bytes for account in self.accounts.values())
+
+    def _pick_victim(self):
+        """Least recently used entry of each cache, scored by idle time x size / recompute cost"""
+        now = time.monotonic()
+        best, best_score = None, -1
+        for account in self.accounts.values():
+            if not account.entries:
+                continue
+            key, (size, last_used) = next(iter(account.entries.items()))
+            score = (now - last_used + 1) * size / max(account.cost, 1e-6)
+            if score > best_score:
+                best, best_score = (account, key), score
+        return best
+
+    def enforce(self):
+        while True:
+            with self._lock:
+                if sum(account.bytes for account in self.accounts.values()) <= self.max_bytes:
+                    return
+                victim = self._pick_victim()
+                if victim is None:
+                    return
+                account, key = victim
+                size, _ = account.entries.pop(key)
+                account.bytes -= size
+                account.evictions += 1
+            # Outside the manager lock: evict() takes the cache's own lock
+            try:
+                account.evict(key)
+            except Exception as e:
+                print(f"⚠️  Evicting {key} from {account.name} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            caches = {name: account.stats() for name, account in self.accounts.items()}
+        return {
+            'maxBytes': self.max_bytes,
+            'bytes': sum(cache['bytes'] for cache in caches.values()),
+            'reservedBytes': sum(cache['reservedBytes'] for cache in caches.values()),
+            'caches': caches
+        }
@@ -0,0 +1,208 @@
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_SUFFIX = '.jsonl.zst' if zstandard else '.jsonl.gz'
+# Firestore caps a batch at 500 writes
+BATCH_SIZE = 400
+# Attempts at the blob read-modify-write when another run changes it in between
+WRITE_ATTEMPTS = 5
+
+
+class ArchiveNotConfigured(RuntimeError):
+    pass
+
+
+class PreconditionFailed(RuntimeError):
+    """The blob changed since it was read (like an object store's ifGenerationMatch failure)"""
+
+
+def generation_of(data):
+    return hashlib.sha1(data).hexdigest() if data is not None else None
+
+
+class LocalBlobStore:
+    """Filesystem stand-in for an object store (GCS/S3-style put/get/delete by key)"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        # Anything under the temp dir disappears on redeploy or lives on another host
+        temp_root = os.path.realpath(tempfile.gettempdir())
+        self.durable = not (os.path.realpath(self.root) + os.sep).startswith(temp_root + os.sep)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    @contextmanager
+    def _locked(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def put(self, key, data, if_generation=False):
+        """Store data; with if_generation (None = must not exist) fail unless the blob is unchanged"""
+        path = self._path(key)
+        with self._locked(path):
+            if if_generation is not False and generation_of(self.get(key)) != if_generation:
+                raise PreconditionFailed(f"{key} changed since it was read")
+            # Write to a temp file and rename so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def archive_key(user_id, suffix=ARCHIVE_SUFFIX):
+    return f"chats/{user_id}{suffix}"
+
+
+def archive_keys(user_id):
+    """Every key a user's archive may live under"""
+    return [archive_key(user_id, '.jsonl.zst'), archive_key(user_id, '.jsonl.gz')]
+
+
+def compress(data, key):
+    if key.endswith('.zst'):
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9)
+
+
+def decompress(data, key):
+    if key.endswith('.zst'):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def read_archive(blob_store, key):
+    """Return {chat_id: record} from a user's archive blob"""
+    if blob_store is None:
+        raise ArchiveNotConfigured("Chat archive storage (CHAT_ARCHIVE_DIR) is not configured")
+    return _parse_archive(blob_store.get(key), key)
+
+
+def _parse_archive(data, key):
+    if not data:
+        return {}
+    records = {}
+    for line in decompress(data, key).splitlines():
+        if line:
+            record = json.loads(line)
+            records[record['chatId']] = record
+    return records
+
+
+def write_archive(blob_store, key, records, if_generation=False):
+    lines = [json.dumps(record, default=_encode, ensure_ascii=False) for record in records.values()]
+    blob = compress("\n".join(lines).encode('utf-8'), key)
+    blob_store.put(key, blob, if_generation=if_generation)
+    return len(blob)
+
+
+def merge_into_archive(blob_store, key, new_records):
+    """Add records to the blob without losing ones a concurrent run wrote; returns the blob size"""
+    for _ in range(WRITE_ATTEMPTS):
+        data = blob_store.get(key)
+        records = _parse_archive(data, key)
+        records.update(new_records)
+        try:
+            return write_archive(blob_store, key, records, if_generation=generation_of(data))
+        except PreconditionFailed:
+            continue
+    raise PreconditionFailed(f"{key} kept changing; giving up after {WRITE_ATTEMPTS} attempts")
+
+
+def parse_timestamps(messages):
+    """Turn archived ISO timestamps back into datetimes before writing messages to Firestore"""
+    for message in messages:
+        if isinstance(message.get('timestamp'), str):
+            message['timestamp'] = datetime.fromisoformat(message['timestamp'])
+    return messages
+
+
+def archive_cold_chats(db, user_id, blob_store, older_than_days):
+    """Move messages of chats untouched for older_than_days into the user's blob, leaving index stubs"""
+    # The blob becomes the only copy of the messages, so it must outlive this host and deploy
+    if blob_store is None or not getattr(blob_store, 'durable', True):
+        raise ArchiveNotConfigured("Refusing to archive: set CHAT_ARCHIVE_DIR to durable storage outside the temp dir")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    chats_ref = db.collection("users").document(user_id).collection("chats")
+    cold = [
+        doc for doc in chats_ref.where("updatedAt", "<", cutoff).stream()
+        if not doc.to_dict().get('archived')
+    ]
+    report = {'userId': user_id, 'documentsArchived': 0, 'bytesReclaimed': 0, 'blobBytes': 0, 'skipped': 0}
+    if not cold:
+        return report
+
+    # Keep appending to an existing blob even if the preferred codec changed since
+    key = next((k for k in archive_keys(user_id) if blob_store.get(k)), archive_key(user_id))
+    # The blob is written before any stub, so a failed Firestore write never loses messages
+    report['blobBytes'] = merge_into_archive(blob_store, key, {doc.id: {'chatId': doc.id, **doc.to_dict()} for doc in cold})
+
+    def stub_update(doc):
+        return {
+            'messages': firestore.DELETE_FIELD,
+            'archived': True,
+            'archiveKey': key,
+            'messageCount': len(doc.to_dict().get('messages', []))
+        }
+
+    def reclaimed(doc):
+        return len(json.dumps(doc.to_dict().get('messages', []), default=_encode))
+
+    for start in range(0, len(cold), BATCH_SIZE):
+        chunk = cold[start:start + BATCH_SIZE]
+        batch = db.batch()
+        for doc in chunk:
+            # Precondition: skip chats that received a message after they were read
+            batch.update(doc.reference, stub_update(doc), option=db.write_option(last_update_time=doc.update_time))
+        try:
+            batch.commit()
+            done = chunk
+        except Exception:
+            done = []
+            for doc in chunk:
+                try:
+                    doc.reference.update(stub_update(doc), option=db.write_option(last_update_time=doc.update_time))
+                    done.append(doc)
+                except Exception:
+                    report['skipped'] += 1
+        report['documentsArchived'] += len(done)
+        report['bytesReclaimed'] += sum(reclaimed(doc) for doc in done)
+
+    return report
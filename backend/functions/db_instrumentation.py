@@ -0,0 +1,282 @@
+import contextvars
+import datetime
+import threading
+import time
+from contextlib import contextmanager
+
+_current_usage = contextvars.ContextVar('firestore_usage', default=None)
+
+USAGE_FIELDS = ('reads', 'writes', 'deletes', 'bytes', 'roundTrips')
+
+
+def _unwrap(ref):
+    return getattr(ref, '_target', ref)
+
+
+def value_size(value):
+    """Approximate stored size of a Firestore value, following the documented size rules"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float, datetime.datetime)):
+        return 8
+    if isinstance(value, dict):
+        return sum(len(str(key).encode('utf-8')) + 1 + value_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(item) for item in value)
+    # References, geo points and sentinels such as SERVER_TIMESTAMP
+    return 16
+
+
+def document_size(path, data):
+    return len(path.encode('utf-8')) + 1 + 32 + value_size(data or {})
+
+
+def _snapshot_size(doc):
+    return document_size(doc.reference.path, doc.to_dict()) if doc.exists else 0
+
+
+class FirestoreUsage:
+    """Billable Firestore work done inside one scope; nested scopes also count towards their parent"""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.counts = dict.fromkeys(USAGE_FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for field, value in counts.items():
+                self.counts[field] += value
+        if self.parent:
+            self.parent.add(**counts)
+
+    def to_dict(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def start_usage():
+    """Begin counting in the current context; pass the returned token to finish_usage()"""
+    return _current_usage.set(FirestoreUsage(_current_usage.get()))
+
+
+def finish_usage(token):
+    usage = _current_usage.get()
+    _current_usage.reset(token)
+    return usage
+
+
+def current_usage():
+    return _current_usage.get()
+
+
+@contextmanager
+def usage_scope():
+    """Count the Firestore work done inside the block, e.g. around a test client request"""
+    token = start_usage()
+    try:
+        yield _current_usage.get()
+    finally:
+        finish_usage(token)
+
+
+def _account(**counts):
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(**counts)
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def assert_within_budget(usage, budget, label='request'):
+    """Raise BudgetExceeded if usage goes over any limit in budget, e.g. {'roundTrips': 2, 'writes': 1}"""
+    counts = usage.to_dict() if isinstance(usage, FirestoreUsage) else usage
+    over = [f"{field} {counts.get(field, 0)} > {limit}"
+            for field, limit in budget.items() if counts.get(field, 0) > limit]
+    if over:
+        raise BudgetExceeded(f"{label} exceeded its Firestore budget: {', '.join(over)}")
+
+
+class UsageMetrics:
+    """Per-endpoint Firestore totals for this worker"""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, counts, over_budget=False):
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'overBudget': 0, 'maxReads': 0, 'maxWrites': 0, **dict.fromkeys(USAGE_FIELDS, 0)
+            })
+            totals['requests'] += 1
+            totals['overBudget'] += int(over_budget)
+            totals['maxReads'] = max(totals['maxReads'], counts['reads'])
+            totals['maxWrites'] = max(totals['maxWrites'], counts['writes'] + counts['deletes'])
+            for field in USAGE_FIELDS:
+                totals[field] += counts[field]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    **totals,
+                    'readsPerRequest': round(totals['reads'] / totals['requests'], 2),
+                    'writesPerRequest': round((totals['writes'] + totals['deletes']) / totals['requests'], 2)
+                }
+                for endpoint, totals in self._endpoints.items()
+            }
+
+
+class _Proxy:
+    """Forwards everything it does not instrument to the wrapped Firestore object"""
+
+    def __init__(self, target, observer):
+        self._target = target
+        self._observer = observer
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def _observe(self, kind, path, fn, count=None, usage=None):
+        """Run fn, report (kind, path, duration, error, result count) to the observer and account its billed usage"""
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = fn()
+            return result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _account(roundTrips=1, **(usage(result) if usage and error is None else {}))
+            self._observer(kind, path, started, time.perf_counter() - started, error,
+                           count(result) if count and error is None else None)
+
+
+class InstrumentedQuery(_Proxy):
+    def _wrap(self, query):
+        return InstrumentedQuery(query, self._observer)
+
+    def where(self, *args, **kwargs):
+        return self._wrap(self._target.where(*args, **kwargs))
+
+    def order_by(self, *args, **kwargs):
+        return self._wrap(self._target.order_by(*args, **kwargs))
+
+    def limit(self, *args, **kwargs):
+        return self._wrap(self._target.limit(*args, **kwargs))
+
+    def select(self, *args, **kwargs):
+        return self._wrap(self._target.select(*args, **kwargs))
+
+    def stream(self, *args, **kwargs):
+        path = getattr(self._target, '_path', None) or getattr(getattr(self._target, '_parent', None), '_path', ())
+        return self._counted('stream', '/'.join(path), self._target.stream(*args, **kwargs))
+
+    def _counted(self, kind, path, docs):
+        """Yield docs as the caller iterates, counting them instead of holding the whole result in memory"""
+        started = time.perf_counter()
+        count, size, error = 0, 0, None
+        try:
+            for doc in docs:
+                count += 1
+                size += _snapshot_size(doc)
+                yield doc
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # A query is billed at least one read even when it matches nothing
+            _account(roundTrips=1, reads=max(1, count), bytes=size)
+            self._observer(kind, path, started, time.perf_counter() - started, error,
+                           count if error is None else None)
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+
+class InstrumentedCollection(InstrumentedQuery):
+    def document(self, *path):
+        return InstrumentedDocument(self._target.document(*path), self._observer)
+
+
+class InstrumentedDocument(_Proxy):
+    def collection(self, name):
+        return InstrumentedCollection(self._target.collection(name), self._observer)
+
+    def _written(self, data):
+        return lambda _: {'writes': 1, 'bytes': document_size(self._target.path, data)}
+
+    def get(self, *args, **kwargs):
+        # Reading a missing document is still billed as one read
+        return self._observe('get', self._target.path, lambda: self._target.get(*args, **kwargs),
+                             lambda doc: 1 if doc.exists else 0,
+                             lambda doc: {'reads': 1, 'bytes': _snapshot_size(doc)})
+
+    def set(self, data, *args, **kwargs):
+        return self._observe('set', self._target.path, lambda: self._target.set(data, *args, **kwargs),
+                             usage=self._written(data))
+
+    def update(self, data, *args, **kwargs):
+        return self._observe('update', self._target.path, lambda: self._target.update(data, *args, **kwargs),
+                             usage=self._written(data))
+
+    def delete(self, *args, **kwargs):
+        return self._observe('delete', self._target.path, lambda: self._target.delete(*args, **kwargs),
+                             usage=lambda _: {'deletes': 1})
+
+
+class InstrumentedBatch(_Proxy):
+    def __init__(self, target, observer):
+        super().__init__(target, observer)
+        self._usage = {'writes': 0, 'deletes': 0, 'bytes': 0}
+
+    def set(self, ref, data, *args, **kwargs):
+        ref = _unwrap(ref)
+        self._usage['writes'] += 1
+        self._usage['bytes'] += document_size(ref.path, data)
+        return self._target.set(ref, data, *args, **kwargs)
+
+    def update(self, ref, data, *args, **kwargs):
+        ref = _unwrap(ref)
+        self._usage['writes'] += 1
+        self._usage['bytes'] += document_size(ref.path, data)
+        return self._target.update(ref, data, *args, **kwargs)
+
+    def delete(self, ref, *args, **kwargs):
+        self._usage['deletes'] += 1
+        return self._target.delete(_unwrap(ref), *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        usage = dict(self._usage)
+        writes = usage['writes'] + usage['deletes']
+        return self._observe('commit', '', lambda: self._target.commit(*args, **kwargs), lambda _: writes,
+                             lambda _: usage)
+
+
+class InstrumentedClient(_Proxy):
+    """Firestore client wrapper that reports every round-trip to observer(kind, path, started, duration, error, count)"""
+
+    def collection(self, *path):
+        return InstrumentedCollection(self._target.collection(*path), self._observer)
+
+    def document(self, *path):
+        return InstrumentedDocument(self._target.document(*path), self._observer)
+
+    def batch(self):
+        return InstrumentedBatch(self._target.batch(), self._observer)
+
+    def get_all(self, refs, *args, **kwargs):
+        refs = [_unwrap(ref) for ref in refs]
+        docs = self._observe('get_all', '', lambda: list(self._target.get_all(refs, *args, **kwargs)),
+                             lambda docs: sum(1 for doc in docs if doc.exists),
+                             lambda docs: {'reads': len(refs), 'bytes': sum(map(_snapshot_size, docs))})
+        return iter(docs)
@@ -0,0 +1,70 @@
+import numpy as np
+
+STEP_HOURS = 3                    # OpenWeather forecast resolution
+DISEASE_HUMIDITY_THRESHOLD = 90   # % RH above which leaves stay wet and fungi spread
+GDD_BASE_TEMP = 10                # °C base temperature for growing degree days
+SOLAR_CONSTANT = 0.0820           # MJ m-2 min-1
+
+
+def extraterrestrial_radiation(lat, day_of_year):
+    """FAO-56 extraterrestrial radiation Ra (MJ m-2 day-1) for an array of days"""
+    phi = np.radians(lat)
+    dr = 1 + 0.033 * np.cos(2 * np.pi * day_of_year / 365)
+    delta = 0.409 * np.sin(2 * np.pi * day_of_year / 365 - 1.39)
+    ws = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1, 1))
+    return (24 * 60 / np.pi) * SOLAR_CONSTANT * dr * (
+        ws * np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.sin(ws)
+    )
+
+
+def daily_agro_features(forecast_items, lat, utc_offset=0):
+    """Per-day agronomic indicators from the full 3-hourly OpenWeather forecast list"""
+    if not forecast_items:
+        return []
+
+    timestamps = np.array([item['dt'] for item in forecast_items], dtype=np.int64) + utc_offset
+    temp_min = np.array([item['main']['temp_min'] for item in forecast_items], dtype=float)
+    temp_max = np.array([item['main']['temp_max'] for item in forecast_items], dtype=float)
+    humidity = np.array([item['main']['humidity'] for item in forecast_items], dtype=float)
+    rain = np.array([item.get('rain', {}).get('3h', 0) for item in forecast_items], dtype=float)
+
+    # Items arrive in time order, so each local day is a contiguous run
+    days = timestamps.astype('datetime64[s]').astype('datetime64[D]')
+    day_values, starts, counts = np.unique(days, return_index=True, return_counts=True)
+
+    tmin = np.minimum.reduceat(temp_min, starts)
+    tmax = np.maximum.reduceat(temp_max, starts)
+    rain_total = np.add.reduceat(rain, starts)
+    humid_hours = np.add.reduceat((humidity >= DISEASE_HUMIDITY_THRESHOLD) * STEP_HOURS, starts)
+    tmean = (tmin + tmax) / 2
+    gdd = np.maximum(tmean - GDD_BASE_TEMP, 0)
+
+    # Hargreaves ET0 (mm/day); 0.408 converts MJ m-2 to mm of evaporated water
+    day_of_year = (day_values - day_values.astype('datetime64[Y]')).astype(int) + 1
+    ra = extraterrestrial_radiation(lat, day_of_year)
+    et0 = 0.0023 * 0.408 * ra * (tmean + 17.8) * np.sqrt(np.maximum(tmax - tmin, 0))
+
+    return [
+        {
+            'date': str(day_values[i]),
+            'temp_min': round(float(tmin[i]), 1),
+            'temp_max': round(float(tmax[i]), 1),
+            'rain': round(float(rain_total[i]), 1),
+            'humid_hours': int(humid_hours[i]),
+            'gdd': round(float(gdd[i]), 1),
+            'et0': round(float(et0[i]), 1),
+            'hours_covered': int(counts[i]) * STEP_HOURS
+        }
+        for i in range(len(day_values))
+    ]
+
+
+def summarize_features(daily, days=5):
+    """Compact one-line-per-day table of daily features for prompts"""
+    lines = ["Daily outlook (date: min/max °C | rain mm | hours RH>=90% | GDD | ET0 mm):"]
+    for day in daily[:days]:
+        lines.append(
+            f"- {day['date'][5:]}: {day['temp_min']:g}/{day['temp_max']:g} | {day['rain']:g} | "
+            f"{day['humid_hours']} | {day['gdd']:g} | {day['et0']:g}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,110 @@
+import numpy as np
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Precision 5 cells are roughly 5 km x 5 km, fine enough for forecast alerts
+ALERT_TILE_PRECISION = 5
+
+HEAVY_RAIN_MM = 50      # daily total
+HEAT_WAVE_C = 40        # daily maximum
+FROST_C = 2             # daily minimum
+
+ALERT_MESSAGES = {
+    'heavy_rain': ("🌧️ Heavy rain expected", "About {value:g}mm of rain is forecast on {date}. Clear drainage channels and delay spraying or fertilizer."),
+    'heat_wave': ("🔥 Heat wave warning", "Temperatures up to {value:g}°C are forecast on {date}. Irrigate early in the morning and shade young plants."),
+    'frost': ("❄️ Frost risk", "Temperatures down to {value:g}°C are forecast on {date}. Cover sensitive crops overnight and irrigate lightly in the evening."),
+}
+
+
+def geohash_encode(lat, lon, precision=ALERT_TILE_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def geohash_center(geohash):
+    """(lat, lon) at the centre of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if (bits >> shift) & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def parse_coordinates(text):
+    """(lat, lon) from a "lat,lon" profile location string, or None"""
+    try:
+        lat, lon = (float(part) for part in str(text).split(','))
+    except ValueError:
+        return None
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+
+def evaluate_alerts(tiles, daily_by_tile):
+    """Return {tile: [alert]} for every tile whose daily forecast crosses an alert threshold"""
+    days = max((len(daily_by_tile.get(tile) or []) for tile in tiles), default=0)
+    if not days:
+        return {}
+
+    # (tiles x days) matrices, NaN-padded where a tile has fewer forecast days
+    shape = (len(tiles), days)
+    rain, tmax, tmin = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    dates = np.full(shape, '', dtype=object)
+    for row, tile in enumerate(tiles):
+        for col, day in enumerate(daily_by_tile.get(tile) or []):
+            rain[row, col], tmax[row, col], tmin[row, col] = day['rain'], day['temp_max'], day['temp_min']
+            dates[row, col] = day['date']
+
+    with np.errstate(invalid='ignore'):
+        triggers = {
+            'heavy_rain': (rain >= HEAVY_RAIN_MM, rain),
+            'heat_wave': (tmax >= HEAT_WAVE_C, tmax),
+            'frost': (tmin <= FROST_C, tmin),
+        }
+
+    alerts = {}
+    for kind, (mask, values) in triggers.items():
+        hit_rows = np.flatnonzero(mask.any(axis=1))
+        first_days = mask.argmax(axis=1)
+        for row in hit_rows:
+            col = first_days[row]
+            alerts.setdefault(tiles[row], []).append({
+                'kind': kind,
+                'date': dates[row, col],
+                'value': round(float(values[row, col]), 1)
+            })
+    return alerts
+
+
+def alert_document(alert):
+    title, body = ALERT_MESSAGES[alert['kind']]
+    return {
+        'kind': alert['kind'],
+        'date': alert['date'],
+        'value': alert['value'],
+        'title': title,
+        'body': body.format(**alert),
+    }
@@ -0,0 +1,181 @@
+import io
+import os
+import threading
+import time
+from collections import Counter
+
+import click
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+GATE_SIZE = 96
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
+
+
+def image_features(image_data):
+    """Vegetation and colour statistics of a downscaled copy of the image"""
+    with Image.open(io.BytesIO(image_data)) as image:
+        # Lets JPEG decode at a reduced scale instead of full resolution
+        image.draft('RGB', (GATE_SIZE * 2, GATE_SIZE * 2))
+        image = image.convert('RGB')
+        image.thumbnail((GATE_SIZE, GATE_SIZE))
+        rgb = np.asarray(image, dtype=np.float32) / 255
+
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    brightness = rgb.max(axis=2)
+    # Luminance change to the next pixel down and right: veins, edges and shading of leaves
+    luma = 0.299 * r + 0.587 * g + 0.114 * b
+    detail = np.zeros_like(luma)
+    detail[:-1, :-1] = np.abs(np.diff(luma, axis=0))[:, :-1] + np.abs(np.diff(luma, axis=1))[:-1, :]
+    chroma = brightness - rgb.min(axis=2)
+    saturation = np.divide(chroma, brightness, out=np.zeros_like(chroma), where=brightness > 0)
+
+    # Excess green index on chromatic coordinates, robust to overall brightness
+    total = r + g + b + 1e-6
+    excess_green = (2 * g - r - b) / total
+
+    # Hue in degrees, only meaningful where there is some colour
+    safe_chroma = np.where(chroma > 0, chroma, 1)
+    hue = np.select(
+        [brightness == r, brightness == g],
+        [((g - b) / safe_chroma) % 6, (b - r) / safe_chroma + 2],
+        (r - g) / safe_chroma + 4
+    ) * 60
+
+    lit = brightness > 0.12
+    coloured = lit & (saturation > 0.18)
+    green = lit & (excess_green > 0.08)
+    # Yellowing and browning leaves still count as vegetation, just not as green
+    foliage_hue = coloured & (hue >= 25) & (hue <= 170)
+    # Sky, water, screens and blue plastic; purple stays out so brinjal is never counted
+    blue = coloured & (hue >= 190) & (hue <= 250)
+    return {
+        'green': float(green.mean()),
+        # Share of green pixels with visible texture: a painted wall or plastic bucket has almost none
+        'leafDetail': float((detail[green] > 0.05).mean()) if green.any() else 0.0,
+        'vegetation': float((green | foliage_hue).mean()),
+        'blue': float(blue.mean()),
+        'colourful': float(coloured.mean()),
+        'grey': float((lit & (saturation < 0.08)).mean()),
+        'meanExcessGreen': float(excess_green[lit].mean()) if lit.any() else 0.0
+    }
+
+
+class PlantGate:
+    """Accepts textured green foliage, rejects blue scenes without vegetation and leaves the rest to Gemini"""
+
+    def __init__(self, accept_green=0.4, min_leaf_detail=0.15, reject_vegetation=0.04, reject_blue=0.6):
+        self.accept_green = accept_green              # green pixel share needed to accept an image as a crop
+        self.min_leaf_detail = min_leaf_detail        # ...with at least this share of textured green pixels
+        self.reject_vegetation = reject_vegetation    # vegetation share at or below which an image may be rejected
+        self.reject_blue = reject_blue                # ...when at least this share of it is blue
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def decide(self, features):
+        # Red, white and grey produce (tomato, chilli, cotton, rice) look like many non-plant
+        # images, and solid colours carry no texture, so all of them go to Gemini
+        if features['green'] >= self.accept_green and features['leafDetail'] >= self.min_leaf_detail:
+            return 'crop'
+        if features['vegetation'] <= self.reject_vegetation and features['blue'] >= self.reject_blue:
+            return 'not crop'
+        return None
+
+    def classify(self, image_data):
+        """Return 'crop', 'not crop', or None when the image is ambiguous (or unreadable) and needs Gemini"""
+        try:
+            verdict = self.decide(image_features(image_data))
+        except Exception as e:
+            print(f"⚠️  Plant gate could not read image: {e}")
+            verdict = None
+        with self._lock:
+            self._counts[verdict or 'escalated'] += 1
+        return verdict
+
+    def stats(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                'accepted': self._counts['crop'],
+                'rejected': self._counts['not crop'],
+                'escalated': self._counts['escalated'],
+                'escalation_rate': round(self._counts['escalated'] / total, 3) if total else None
+            }
+
+
+def make_plant_gate():
+    """Gate configured from PLANT_GATE_* settings, or None when disabled or Pillow is missing"""
+    if Image is None or os.environ.get('PLANT_GATE', 'on') == 'off':
+        return None
+    return PlantGate(
+        accept_green=float(os.environ.get('PLANT_GATE_ACCEPT_GREEN', 0.4)),
+        min_leaf_detail=float(os.environ.get('PLANT_GATE_MIN_LEAF_DETAIL', 0.15)),
+        reject_vegetation=float(os.environ.get('PLANT_GATE_REJECT_VEGETATION', 0.04)),
+        reject_blue=float(os.environ.get('PLANT_GATE_REJECT_BLUE', 0.6))
+    )
+
+
+def evaluate(directory, gate):
+    """Run the gate over directory/crop/* and directory/not_crop/* and report accuracy and escalation rate"""
+    counts = Counter()
+    mistakes, escalations = [], []
+    started = time.perf_counter()
+    for label in ('crop', 'not_crop'):
+        folder = os.path.join(directory, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            with open(os.path.join(folder, name), 'rb') as f:
+                verdict = gate.classify(f.read())
+            counts['total'] += 1
+            if verdict is None:
+                counts['escalated'] += 1
+                escalations.append(f"{label}/{name}")
+            elif verdict == label.replace('_', ' '):
+                counts['correct'] += 1
+            else:
+                counts['false_accept' if verdict == 'crop' else 'false_reject'] += 1
+                mistakes.append(f"{label}/{name}")
+
+    decided = counts['total'] - counts['escalated']
+    return {
+        'images': counts['total'],
+        'decided_locally': decided,
+        'escalated': counts['escalated'],
+        'escalation_rate': round(counts['escalated'] / counts['total'], 3) if counts['total'] else None,
+        # Accuracy of local decisions, and overall assuming Gemini gets escalated images right
+        'local_accuracy': round(counts['correct'] / decided, 3) if decided else None,
+        'overall_accuracy': round((counts['correct'] + counts['escalated']) / counts['total'], 3) if counts['total'] else None,
+        'false_accepts': counts['false_accept'],
+        'false_rejects': counts['false_reject'],
+        'ms_per_image': round((time.perf_counter() - started) * 1000 / max(1, counts['total']), 2),
+        'mistakes': mistakes,
+        'escalations': escalations
+    }
+
+
+@click.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--accept-green', default=0.4, help='Green pixel share needed to accept an image as a crop')
+@click.option('--min-leaf-detail', default=0.15, help='Share of textured green pixels needed to accept an image')
+@click.option('--reject-vegetation', default=0.04, help='Vegetation share at or below which an image may be rejected')
+@click.option('--reject-blue', default=0.6, help='Blue pixel share at or above which a vegetation-free image is rejected')
+def main(directory, accept_green, min_leaf_detail, reject_vegetation, reject_blue):
+    """Evaluate the plant gate on a labelled folder with crop/ and not_crop/ subfolders"""
+    report = evaluate(directory, PlantGate(accept_green, min_leaf_detail, reject_vegetation, reject_blue))
+    for mistake in report.pop('mistakes'):
+        print(f"✗ {mistake}")
+    for escalation in report.pop('escalations'):
+        print(f"? {escalation}")
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+
+MAX_SECONDS = 60
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def sample_stacks(seconds, interval=0.005):
+    """Sample every other thread's Python stack and return collapsed stacks (flamegraph.pl input)"""
+    counts = Counter()
+    me = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            counts[';'.join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+
+
+def heap_growth(seconds, frames=25, limit=200):
+    """Trace allocations for seconds and return the growth per allocation stack as collapsed stacks of bytes"""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    lines = []
+    for stat in after.compare_to(before, 'traceback')[:limit]:
+        if stat.size_diff <= 0:
+            continue
+        stack = ';'.join(f"{os.path.basename(f.filename)}:{f.lineno}" for f in reversed(stat.traceback))
+        lines.append(f"{stack} {stat.size_diff}")
+    return "\n".join(lines)
+
+
+class ProfileSessions:
+    """Runs one profiling session at a time on a background thread; nothing runs while idle"""
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self._results = OrderedDict()   # id -> {'mode', 'seconds', 'status', 'output'}
+        self._lock = threading.Lock()
+        self._running = None
+
+    def start(self, mode, seconds):
+        """Start a session and return its id, or None if one is already running"""
+        seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+        with self._lock:
+            if self._running:
+                return None
+            session_id = uuid.uuid4().hex[:12]
+            self._running = session_id
+            self._results[session_id] = {'mode': mode, 'seconds': seconds, 'status': 'running', 'output': None}
+            while len(self._results) > self.keep:
+                self._results.popitem(last=False)
+
+        def run():
+            try:
+                output = heap_growth(seconds) if mode == 'heap' else sample_stacks(seconds)
+                result = {'status': 'done', 'output': output}
+            except Exception as e:
+                result = {'status': 'failed', 'output': f"{type(e).__name__}: {e}"}
+            with self._lock:
+                self._results.get(session_id, {}).update(result)
+                self._running = None
+
+        threading.Thread(target=run, daemon=True, name='profiler').start()
+        return session_id
+
+    def result(self, session_id):
+        return self._results.get(session_id)
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+def _connection(local, db_path):
+    """This thread's connection to db_path, reopened after a fork"""
+    conn = getattr(local, 'conn', None)
+    # Connections must not cross a fork (gunicorn --preload)
+    if conn is None or local.pid != os.getpid():
+        conn = sqlite3.connect(db_path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets, kept in memory or in a SQLite file shared by the workers on a host"""
+
+    PRUNE_INTERVAL = 60   # seconds between sweeps of buckets that have refilled completely
+
+    def __init__(self, rate, capacity, db_path=None, max_keys=10000):
+        self.rate = rate            # tokens refilled per second
+        self.capacity = capacity    # burst size
+        self.db_path = db_path
+        self.max_keys = max_keys
+        self._buckets = {}          # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pruned_at = 0
+        if db_path:
+            with self._connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated_at REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS buckets_updated_at ON buckets (updated_at)")
+
+    def take(self, key, cost):
+        """Spend cost tokens for key; return 0 if allowed, else seconds until it would be"""
+        if self.db_path:
+            return self._take_shared(key, cost)
+
+        with self._lock:
+            now = time.time()
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens, wait = self._spend(tokens, updated_at, now, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return wait
+
+    def _spend(self, tokens, updated_at, now, cost):
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        if tokens >= cost:
+            return tokens - cost, 0
+        return tokens, (cost - tokens) / self.rate
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = self.capacity / self.rate
+        for key, (_, updated_at) in list(self._buckets.items()):
+            if now - updated_at >= full_after:
+                del self._buckets[key]
+
+    def _connection(self):
+        return _connection(self._local, self.db_path)
+
+    def _take_shared(self, key, cost):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (self.capacity, now)
+            tokens, wait = self._spend(tokens, updated_at, now, cost)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            if now - self._pruned_at >= self.PRUNE_INTERVAL:
+                # A missing row means a full bucket, so full ones can go (one-off IPs, past users)
+                conn.execute("DELETE FROM buckets WHERE updated_at <= ?", (now - self.capacity / self.rate,))
+                self._pruned_at = now
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class UpstreamBusy(RuntimeError):
+    pass
+
+
+class ConcurrencyGate:
+    """Caps concurrent calls per upstream across the workers on a host, as leased rows in a SQLite file"""
+
+    def __init__(self, limits, db_path=None, lease=120, poll=0.05):
+        self.limits = limits
+        self.db_path = db_path
+        self.lease = lease      # seconds after which the slot of a killed worker is reclaimed
+        self.poll = poll
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+        self._local = threading.local()
+        if db_path:
+            with _connection(self._local, db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS upstream_slots (id TEXT PRIMARY KEY, upstream TEXT, expires_at REAL)"
+                )
+
+    def acquire(self, name, timeout=0.5):
+        """Wait up to timeout for a slot on upstream name; return its id, or None if all stayed taken"""
+        if not self.db_path:
+            return name if self._semaphores[name].acquire(timeout=timeout) else None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            slot = self._try_acquire(name)
+            if slot or time.monotonic() >= deadline:
+                return slot
+            time.sleep(self.poll)
+
+    def _try_acquire(self, name):
+        conn = _connection(self._local, self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute("DELETE FROM upstream_slots WHERE expires_at <= ?", (now,))
+            (held,) = conn.execute("SELECT COUNT(*) FROM upstream_slots WHERE upstream = ?", (name,)).fetchone()
+            slot = None
+            if held < self.limits[name]:
+                slot = uuid.uuid4().hex
+                conn.execute("INSERT INTO upstream_slots (id, upstream, expires_at) VALUES (?, ?, ?)",
+                             (slot, name, now + self.lease))
+            conn.execute("COMMIT")
+            return slot
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release(self, name, slot):
+        if not self.db_path:
+            self._semaphores[name].release()
+            return
+        _connection(self._local, self.db_path).execute("DELETE FROM upstream_slots WHERE id = ?", (slot,))
+
@@ -0,0 +1,202 @@
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Question words stay in: "when to plant wheat" and "how to plant wheat" need different answers
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'be', 'to', 'of', 'in', 'on', 'for', 'and', 'or',
+    'my', 'i', 'me', 'do', 'does', 'can', 'should', 'please',
+}
+
+
+def normalize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def hashed_features(text, dims):
+    """Signed hashed term counts over unigrams and bigrams"""
+    tokens = normalize(text)
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        vector[digest % dims] += 1.0 if (digest >> 63) else -1.0
+    # Sublinear term frequency, keeping the hash sign
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+class _Partition:
+    """Vector rows grow by doubling up to capacity, so a rarely used language stays small"""
+
+    def __init__(self, capacity, dims, initial_rows=32):
+        self.capacity = capacity
+        rows = min(initial_rows, capacity)
+        self.vectors = np.zeros((rows, dims), dtype=np.float32)
+        self.doc_freq = np.zeros(dims, dtype=np.float32)
+        self.used = np.zeros(rows, dtype=bool)
+        self.last_used = np.zeros(rows)
+        self.created = np.zeros(rows)
+        self.questions = [None] * rows
+        self.answers = [None] * rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def grow(self):
+        """Add rows if below capacity; returns False when full"""
+        rows = len(self.used)
+        extra = min(rows, self.capacity - rows)
+        if extra <= 0:
+            return False
+        self.vectors = np.vstack([self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)])
+        self.used = np.concatenate([self.used, np.zeros(extra, dtype=bool)])
+        self.last_used = np.concatenate([self.last_used, np.zeros(extra)])
+        self.created = np.concatenate([self.created, np.zeros(extra)])
+        self.questions += [None] * extra
+        self.answers += [None] * extra
+        return True
+
+    def idf(self):
+        count = self.used.sum()
+        return np.log((1 + count) / (1 + self.doc_freq)).astype(np.float32) + 1
+
+    def remove(self, slot):
+        self.doc_freq -= self.vectors[slot] != 0
+        self.vectors[slot] = 0
+        self.used[slot] = False
+        self.questions[slot] = None
+        self.answers[slot] = None
+
+
+class SemanticCache:
+    """Reuses answers for near-duplicate questions, with one partition of TF-IDF vectors per language"""
+
+    def __init__(self, threshold=0.85, dims=1024, capacity=1000, ttl=7 * 24 * 60 * 60, max_partitions=8):
+        self.threshold = threshold
+        self.dims = dims
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_partitions = max_partitions
+        self._partitions = {}
+        self._lock = threading.Lock()
+        self.account = None     # CacheAccount when registered with a CacheManager; keys are (language, slot)
+
+    def _partition(self, language, create=False):
+        """Existing partition for language; only store() creates one, and only up to max_partitions"""
+        partition = self._partitions.get(language)
+        if partition is None and create and len(self._partitions) < self.max_partitions:
+            partition = self._partitions[language] = _Partition(self.capacity, self.dims)
+        return partition
+
+    def _removed(self, language, slot, evicted=True):
+        if self.account:
+            self.account.removed((language, int(slot)), evicted)
+
+    def discard(self, key):
+        language, slot = key
+        with self._lock:
+            partition = self._partitions.get(language)
+            if partition is not None and partition.used[slot]:
+                partition.remove(slot)
+                partition.evictions += 1
+
+    def lookup(self, question, language='en'):
+        """Return (answer, similarity) for the closest stored question above threshold, else None"""
+        query = hashed_features(question, self.dims)
+        with self._lock:
+            partition = self._partition(language)
+            if partition is None:
+                if self.account:
+                    self.account.miss()
+                return None
+            now = time.time()
+            expired = np.flatnonzero(partition.used & (partition.created < now - self.ttl))
+            for slot in expired:
+                partition.remove(slot)
+                partition.evictions += 1
+                self._removed(language, slot)
+
+            if not query.any() or not partition.used.any():
+                partition.misses += 1
+                if self.account:
+                    self.account.miss()
+                return None
+
+            weights = partition.idf()
+            weighted_query = query * weights
+            weighted = partition.vectors * weights
+            norms = np.linalg.norm(weighted, axis=1) * np.linalg.norm(weighted_query)
+            scores = np.divide(weighted @ weighted_query, norms, out=np.zeros(len(partition.used), dtype=np.float32), where=norms > 0)
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                partition.misses += 1
+                if self.account:
+                    self.account.miss()
+                return None
+
+            partition.hits += 1
+            partition.last_used[slot] = now
+            if self.account:
+                self.account.hit((language, slot))
+            return partition.answers[slot], float(scores[slot])
+
+    def store(self, question, answer, language='en'):
+        vector = hashed_features(question, self.dims)
+        if not vector.any():
+            return
+        with self._lock:
+            partition = self._partition(language, create=True)
+            if partition is None:
+                return
+            free = np.flatnonzero(~partition.used)
+            if not len(free) and partition.grow():
+                free = np.flatnonzero(~partition.used)
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(partition.last_used))
+                partition.remove(slot)
+                partition.evictions += 1
+                self._removed(language, slot)
+            now = time.time()
+            partition.vectors[slot] = vector
+            partition.doc_freq += vector != 0
+            partition.used[slot] = True
+            partition.created[slot] = now
+            partition.last_used[slot] = now
+            partition.questions[slot] = question
+            partition.answers[slot] = answer
+        if self.account:
+            # Entry size includes its row of the vector matrix
+            self.account.added((language, slot), (question, answer, vector))
+
+    def purge(self, language=None, contains=None):
+        """Drop entries for one language (or all), optionally only questions containing a phrase"""
+        removed = 0
+        with self._lock:
+            for name, partition in self._partitions.items():
+                if language and name != language:
+                    continue
+                for slot in np.flatnonzero(partition.used):
+                    if contains and contains.lower() not in partition.questions[slot].lower():
+                        continue
+                    partition.remove(slot)
+                    self._removed(name, slot, evicted=False)
+                    removed += 1
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'entries': int(partition.used.sum()),
+                    'hits': partition.hits,
+                    'misses': partition.misses,
+                    'hit_rate': round(partition.hits / max(1, partition.hits + partition.misses), 3),
+                    'evictions': partition.evictions
+                }
+                for name, partition in self._partitions.items()
+            }
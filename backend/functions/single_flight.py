@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one computation per key at a time; duplicates wait for it and recent results are replayed"""
+
+    def __init__(self, replay_for=60, wait_timeout=120, max_entries=1024):
+        self.replay_for = replay_for
+        self.wait_timeout = wait_timeout
+        self.max_entries = max_entries
+        self._calls = {}
+        self._done = OrderedDict()   # key -> (result, finished_at)
+        self._lock = threading.Lock()
+        self.account = None          # CacheAccount when registered with a CacheManager
+
+    def discard(self, key):
+        with self._lock:
+            self._done.pop(key, None)
+
+    def do(self, key, fn, replayable=lambda result: True):
+        """Return fn()'s result, sharing it with concurrent and recent callers using the same key"""
+        with self._lock:
+            done = self._done.get(key)
+            if done and time.time() - done[1] < self.replay_for:
+                if self.account:
+                    self.account.hit(key)
+                return done[0]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                return fn()
+            if call.error:
+                raise call.error
+            return call.result
+
+        if self.account:
+            self.account.miss()
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            remembered, dropped = False, []
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and replayable(call.result):
+                    remembered = True
+                    self._done[key] = (call.result, time.time())
+                    self._done.move_to_end(key)
+                    while len(self._done) > self.max_entries:
+                        dropped.append(self._done.popitem(last=False)[0])
+            call.event.set()
+            if self.account:
+                for old_key in dropped:
+                    self.account.removed(old_key)
+                if remembered:
+                    self.account.added(key, call.result)
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class Degraded(Exception):
+    """Raised by a loader with a value good enough to serve now but not to keep as the last good one"""
+
+    def __init__(self, value):
+        super().__init__('degraded value')
+        self.value = value
+
+
+class StaleWhileRevalidateStore:
+    """Keyed store that serves the last good value and refreshes it in the background"""
+
+    def __init__(self, name, fresh_for, stale_for, max_entries=1024, backend=None):
+        self.name = name
+        self.fresh_for = fresh_for      # seconds a value is served without refreshing
+        self.stale_for = stale_for      # extra seconds a value is served while a refresh runs
+        self.max_entries = max_entries
+        self.backend = backend          # optional shared CacheBackend behind the in-memory entries
+        self._entries = OrderedDict()   # key -> (value, fetched_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.account = None             # CacheAccount when registered with a CacheManager
+
+    def get(self, key, loader):
+        """Return (value, age_seconds), only calling loader inline when nothing usable is stored"""
+        entry = self._lookup(key)
+        if entry:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.fresh_for:
+                self._count_hit(key)
+                return value, age
+            if age < self.fresh_for + self.stale_for:
+                self._count_hit(key)
+                self._refresh_in_background(key, loader)
+                return value, age
+        if self.account:
+            self.account.miss()
+
+        try:
+            return self._load(key, loader), 0.0
+        except Degraded as degraded:
+            return degraded.value, 0.0
+        except Exception:
+            # Past the staleness bound and upstream is down: an old value beats an error
+            if entry:
+                return entry[0], time.time() - entry[1]
+            raise
+
+    def put(self, key, value):
+        fetched_at = time.time()
+        self._remember(key, (value, fetched_at))
+        if self.backend:
+            try:
+                self.backend.set(self._backend_key(key), [value, fetched_at], self.fresh_for + self.stale_for)
+            except Exception as e:
+                print(f"⚠️  {self.name} cache write failed: {e}")
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _count_hit(self, key):
+        if self.account:
+            self.account.hit(key)
+
+    def _remember(self, key, entry):
+        dropped = []
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                dropped.append(self._entries.popitem(last=False)[0])
+        if self.account:
+            for old_key in dropped:
+                self.account.removed(old_key)
+            self.account.added(key, entry[0])
+
+    def _backend_key(self, key):
+        return f"{self.name}:{json.dumps(key)}"
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+        # Another worker (or the previous deploy) may already hold a newer value
+        if self.backend and (not entry or time.time() - entry[1] >= self.fresh_for):
+            try:
+                stored = self.backend.get(self._backend_key(key))
+            except Exception as e:
+                print(f"⚠️  {self.name} cache read failed: {e}")
+                stored = None
+            if stored and (not entry or stored[1] > entry[1]):
+                entry = (stored[0], stored[1])
+                self._remember(key, entry)
+        return entry
+
+    def _load(self, key, loader):
+        value = loader()
+        self.put(key, value)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                print(f"⚠️  {self.name} background refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
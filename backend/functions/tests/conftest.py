@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+# app.py must import without credentials; caches stay in memory for the test run
+for name in ('FIREBASE_KEY', 'GEMINI_API_KEY', 'OPENWEATHER_API_KEY', 'RATE_LIMIT_DB'):
+    os.environ.pop(name, None)
+os.environ['CACHE_BACKEND'] = 'memory'
+os.environ['PLANT_GATE'] = 'off'
+
+from fake_firestore import FakeFirestore
+
+WEATHER = {
+    'current': {'temperature': 31, 'humidity': 60, 'description': 'clear sky', 'wind_speed': 2,
+                'pressure': 1010, 'feels_like': 33},
+    'forecast': [],
+    'daily': []
+}
+
+
+def gemini_reply(contents):
+    prompt = contents if isinstance(contents, str) else contents[0]
+    if "respond with only 'crop'" in prompt:
+        return 'crop'
+    if 'ONE short tip' in prompt:
+        return json.dumps({'heading': 'Water early 💧', 'body': 'Water the wheat before 9am.'})
+    if 'farming suggestions' in prompt:
+        return json.dumps([{'text': f'Tip {i} for wheat', 'category': 'care', 'crop': 'wheat', 'priority': 'medium'}
+                           for i in range(4)])
+    if 'Translate each string' in prompt:
+        return json.dumps(json.loads(prompt[prompt.index('['):prompt.rindex(']') + 1]))
+    return 'Consult an expert.'
+
+
+def fake_gemini(contents, cache_ttl=None, parse=None):
+    text = gemini_reply(contents)
+    return parse(text) if parse else text
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """app.py wired to an empty fake Firestore, with Gemini, OpenWeather and the HF model stubbed out"""
+    import app
+    monkeypatch.setattr(app, 'db', app.InstrumentedClient(FakeFirestore(), app.record_firestore_op))
+    monkeypatch.setattr(app, 'generate_with_gemini', fake_gemini)
+    monkeypatch.setattr(app, 'fetch_weather_data', lambda lat, lon: WEATHER)
+    monkeypatch.setattr(app, 'call_hf_model_api', lambda image, is_file=True: {'success': True, 'disease': 'Healthy'})
+    app.recent_activity.clear()
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
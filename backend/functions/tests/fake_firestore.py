@@ -0,0 +1,196 @@
+import copy
+import threading
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud import firestore
+
+_clock_lock = threading.Lock()
+_last_tick = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _tick():
+    """Wall-clock update times like the server's, strictly increasing so ETags change on every write"""
+    global _last_tick
+    with _clock_lock:
+        _last_tick = max(datetime.now(timezone.utc), _last_tick + timedelta(microseconds=1))
+        return _last_tick
+
+
+def _aware(value):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.astimezone()
+    return value
+
+
+def _apply(data, field, value, now, merge=False):
+    """Set one (possibly dotted) field, resolving Firestore sentinels and transforms"""
+    *parents, name = field.split('.')
+    for parent in parents:
+        data = data.setdefault(parent, {})
+    if merge and isinstance(value, dict) and isinstance(data.get(name), dict):
+        # set(merge=True) merges nested maps, where update() replaces them
+        for key, item in value.items():
+            _apply(data[name], key, item, now, merge=True)
+    elif value is firestore.DELETE_FIELD:
+        data.pop(name, None)
+    elif value is firestore.SERVER_TIMESTAMP:
+        data[name] = now
+    elif isinstance(value, firestore.ArrayUnion):
+        existing = data.get(name) or []
+        data[name] = existing + [item for item in value.values if item not in existing]
+    elif isinstance(value, firestore.ArrayRemove):
+        data[name] = [item for item in data.get(name) or [] if item not in value.values]
+    else:
+        data[name] = copy.deepcopy(value)
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, update_time):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+        self.update_time = update_time
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self.exists else None
+
+
+class FakeDocument:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name):
+        return FakeCollection(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None):
+        data, update_time = self._client.docs.get(self.path, (None, None))
+        return FakeSnapshot(self, data, update_time)
+
+    def set(self, data, merge=False):
+        now = _tick()
+        stored = copy.deepcopy(self._client.docs[self.path][0]) if merge and self.path in self._client.docs else {}
+        for field, value in data.items():
+            _apply(stored, field, value, now, merge)
+        self._client.docs[self.path] = (stored, now)
+
+    def update(self, data, option=None):
+        if self.path not in self._client.docs:
+            raise NotFound(f"No document to update: {self.path}")
+        stored, update_time = self._client.docs[self.path]
+        if option is not None and option.last_update_time != update_time:
+            raise FailedPrecondition(f"{self.path} changed since {option.last_update_time}")
+        now = _tick()
+        stored = copy.deepcopy(stored)
+        for field, value in data.items():
+            _apply(stored, field, value, now)
+        self._client.docs[self.path] = (stored, now)
+        return SimpleNamespace(update_time=now)
+
+    def delete(self):
+        self._client.docs.pop(self.path, None)
+
+
+class FakeQuery:
+    def __init__(self, client, path, filters=(), order=None, count=None, fields=None):
+        self._client = client
+        self._path = path
+        self._filters = filters
+        self._order = order
+        self._count = count
+        self._fields = fields
+
+    def _with(self, **changes):
+        state = {'filters': self._filters, 'order': self._order, 'count': self._count, 'fields': self._fields}
+        return FakeQuery(self._client, self._path, **{**state, **changes})
+
+    def where(self, field, op, value):
+        return self._with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction=None):
+        return self._with(order=(field, direction == firestore.Query.DESCENDING))
+
+    def limit(self, count):
+        return self._with(count=count)
+
+    def select(self, fields):
+        return self._with(fields=list(fields))
+
+    def _matches(self, data):
+        ops = {'>': lambda a, b: a > b, '>=': lambda a, b: a >= b, '<': lambda a, b: a < b,
+               '<=': lambda a, b: a <= b, '==': lambda a, b: a == b}
+        for field, op, value in self._filters:
+            if field not in data or not ops[op](_aware(data[field]), _aware(value)):
+                return False
+        return True
+
+    def stream(self):
+        prefix = self._path + '/'
+        docs = []
+        for path, (data, update_time) in sorted(self._client.docs.items()):
+            if not path.startswith(prefix) or '/' in path[len(prefix):] or not self._matches(data):
+                continue
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            docs.append(FakeSnapshot(FakeDocument(self._client, path), data, update_time))
+        if self._order:
+            field, descending = self._order
+            docs = [doc for doc in docs if field in doc._data]
+            docs.sort(key=lambda doc: _aware(doc._data[field]), reverse=descending)
+        return iter(docs[:self._count] if self._count is not None else docs)
+
+
+class FakeCollection(FakeQuery):
+    def document(self, document_id):
+        return FakeDocument(self._client, f"{self._path}/{document_id}")
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, ref, data, merge=False):
+        self._writes.append(lambda: ref.set(data, merge=merge))
+
+    def update(self, ref, data, option=None):
+        self._writes.append(lambda: ref.update(data, option))
+
+    def delete(self, ref):
+        self._writes.append(ref.delete)
+
+    def commit(self):
+        # All or nothing, like a Firestore batch
+        saved = dict(self._client.docs)
+        try:
+            for write in self._writes:
+                write()
+        except Exception:
+            self._client.docs = saved
+            raise
+
+
+class FakeFirestore:
+    """In-memory stand-in for the parts of the Firestore client app.py uses"""
+
+    def __init__(self):
+        self.docs = {}   # document path -> (data, update time)
+
+    def collection(self, *path):
+        return FakeCollection(self, '/'.join(path))
+
+    def document(self, *path):
+        return FakeDocument(self, '/'.join(path))
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def write_option(self, last_update_time):
+        return SimpleNamespace(last_update_time=last_update_time)
+
+    def get_all(self, refs, field_paths=None):
+        return iter([ref.get() for ref in refs])
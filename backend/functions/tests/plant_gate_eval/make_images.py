@@ -0,0 +1,205 @@
+"""Regenerate the synthetic plant gate evaluation set: python tests/plant_gate_eval/make_images.py"""
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+SIZE = 256
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def canvas(colour):
+    return Image.new('RGB', (SIZE, SIZE), colour)
+
+
+def finish(image, rng, noise=6, lighting=0.25, blur=0.8):
+    """Camera-like lighting falloff, sensor noise and softness"""
+    rgb = np.asarray(image.filter(ImageFilter.GaussianBlur(blur)), dtype=np.float32)
+    y, x = np.mgrid[0:SIZE, 0:SIZE] / SIZE
+    cx, cy = rng.uniform(0.2, 0.8, 2)
+    falloff = 1 - lighting * ((x - cx) ** 2 + (y - cy) ** 2)
+    rgb = rgb * falloff[..., None] + rng.normal(0, noise, rgb.shape)
+    return Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8))
+
+
+def jitter(rng, colour, amount=18):
+    """Mostly a brightness shift, so whites and greys stay neutral"""
+    shift = rng.integers(-amount, amount + 1)
+    return tuple(int(np.clip(c + shift + rng.integers(-3, 4), 0, 255)) for c in colour)
+
+
+def leaf(draw, rng, centre, length, colour, vein=None):
+    """An elliptical leaf with a midrib and side veins"""
+    cx, cy = centre
+    angle = rng.uniform(0, np.pi)
+    width = length * rng.uniform(0.35, 0.5)
+    t = np.linspace(0, 2 * np.pi, 40)
+    px, py = length / 2 * np.cos(t), width / 2 * np.sin(t)
+    ca, sa = np.cos(angle), np.sin(angle)
+    points = [(cx + u * ca - v * sa, cy + u * sa + v * ca) for u, v in zip(px, py)]
+    draw.polygon(points, fill=jitter(rng, colour))
+    vein = vein or tuple(max(0, c - 45) for c in colour)
+    tip = (cx + length / 2 * ca, cy + length / 2 * sa)
+    base = (cx - length / 2 * ca, cy - length / 2 * sa)
+    draw.line([base, tip], fill=vein, width=2)
+    for step in np.linspace(-0.35, 0.35, 6):
+        sx, sy = cx + step * length * ca, cy + step * length * sa
+        for side in (-1, 1):
+            ex = sx + (0.15 * length * ca) - side * width * 0.45 * sa
+            ey = sy + (0.15 * length * sa) + side * width * 0.45 * ca
+            draw.line([(sx, sy), (ex, ey)], fill=vein, width=1)
+
+
+def foliage(rng, colours, background, count=18, spots=None):
+    image = canvas(background)
+    draw = ImageDraw.Draw(image)
+    for _ in range(count):
+        leaf(draw, rng, rng.uniform(0, SIZE, 2), rng.uniform(70, 150), colours[rng.integers(len(colours))])
+    for _ in range(spots or 0):
+        x, y = rng.uniform(0, SIZE, 2)
+        r = rng.uniform(3, 9)
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=jitter(rng, (120, 80, 30)))
+    return image
+
+
+def blobs(rng, colour, background, count, radius, elongation=1.0, highlight=True, stems=None):
+    image = canvas(background)
+    draw = ImageDraw.Draw(image)
+    for _ in range(count):
+        x, y = rng.uniform(0, SIZE, 2)
+        r = rng.uniform(*radius)
+        box = [x - r * elongation, y - r, x + r * elongation, y + r]
+        draw.ellipse(box, fill=jitter(rng, colour, 14))
+        if highlight:
+            draw.ellipse([x - r * 0.5, y - r * 0.6, x - r * 0.1, y - r * 0.2], fill=jitter(rng, (250, 235, 230), 5))
+        if stems:
+            draw.line([(x, y - r), (x + rng.uniform(-6, 6), y - r - 10)], fill=stems, width=3)
+    return image
+
+
+def field_rows(rng):
+    image = canvas((120, 85, 55))
+    draw = ImageDraw.Draw(image)
+    for row in range(0, SIZE, 32):
+        for _ in range(14):
+            leaf(draw, rng, (rng.uniform(0, SIZE), row + rng.uniform(6, 22)), rng.uniform(25, 45), (60, 140, 45))
+    return image
+
+
+def wheat_ears(rng):
+    image = canvas((190, 170, 110))
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x = rng.uniform(0, SIZE)
+        y = rng.uniform(-20, SIZE)
+        for k in range(8):
+            draw.ellipse([x - 5, y + k * 9, x + 5, y + k * 9 + 11], fill=jitter(rng, (205, 160, 60)))
+        draw.line([(x, y + 72), (x + rng.uniform(-8, 8), SIZE)], fill=(170, 140, 70), width=2)
+    return image
+
+
+def text_page(rng):
+    image = canvas((245, 245, 242))
+    draw = ImageDraw.Draw(image)
+    for y in range(20, SIZE - 10, 14):
+        x = 16
+        while x < SIZE - 30:
+            width = rng.integers(8, 36)
+            draw.rectangle([x, y, x + width, y + 6], fill=(40, 40, 45))
+            x += width + 6
+    return image
+
+
+def noise_texture(rng, colour, amount):
+    rgb = np.asarray(canvas(colour), dtype=np.float32)
+    grain = rng.normal(0, amount, (SIZE // 4, SIZE // 4))
+    grain = np.kron(grain, np.ones((4, 4)))[..., None]
+    return Image.fromarray(np.clip(rgb + grain, 0, 255).astype(np.uint8))
+
+
+def bricks(rng):
+    image = canvas((190, 185, 175))
+    draw = ImageDraw.Draw(image)
+    for row, y in enumerate(range(0, SIZE, 24)):
+        for x in range(-40 * (row % 2), SIZE, 80):
+            draw.rectangle([x + 2, y + 2, x + 76, y + 20], fill=jitter(rng, (165, 60, 45)))
+    return image
+
+
+def plastic_object(rng, colour, background):
+    """A smoothly shaded single-colour object (bucket, chair, tarp) filling most of the frame"""
+    image = canvas(background)
+    draw = ImageDraw.Draw(image)
+    for i in range(60, 0, -1):
+        shade = tuple(int(c * (0.7 + 0.3 * i / 60)) for c in colour)
+        draw.ellipse([128 - i * 2, 128 - i * 2.2, 128 + i * 2, 128 + i * 2.2], fill=shade)
+    return image
+
+
+def sky(rng):
+    image = canvas((110, 160, 225))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.uniform(0, SIZE, 2)
+        draw.ellipse([x - 40, y - 15, x + 40, y + 15], fill=(235, 240, 248))
+    return image
+
+
+def fabric(rng, colour):
+    image = canvas(colour)
+    draw = ImageDraw.Draw(image)
+    dark = tuple(int(c * 0.6) for c in colour)
+    for x in range(0, SIZE, 8):
+        draw.line([(x, 0), (x, SIZE)], fill=dark, width=2)
+    for y in range(0, SIZE, 8):
+        draw.line([(0, y), (SIZE, y)], fill=dark, width=1)
+    return image
+
+
+IMAGES = {
+    'crop': {
+        'leaves_healthy_1': lambda rng: foliage(rng, [(70, 150, 50), (50, 120, 40), (90, 170, 60)], (40, 80, 30)),
+        'leaves_healthy_2': lambda rng: foliage(rng, [(80, 160, 70), (60, 135, 55)], (95, 75, 50), count=10),
+        'leaves_healthy_3': lambda rng: foliage(rng, [(40, 110, 35), (60, 140, 45)], (30, 60, 25), count=30),
+        'leaf_spots': lambda rng: foliage(rng, [(75, 150, 55), (95, 160, 60)], (50, 90, 35), spots=40),
+        'leaves_yellowing': lambda rng: foliage(rng, [(170, 170, 60), (140, 160, 50), (190, 160, 50)], (80, 70, 40)),
+        'leaves_blight': lambda rng: foliage(rng, [(120, 90, 45), (140, 120, 50), (90, 130, 45)], (70, 55, 35), spots=60),
+        'field_rows': field_rows,
+        'wheat_ears': wheat_ears,
+        'tomatoes': lambda rng: blobs(rng, (200, 35, 30), (90, 120, 60), 14, (22, 34), stems=(50, 110, 40)),
+        'red_chillies': lambda rng: blobs(rng, (185, 20, 25), (215, 205, 185), 26, (7, 10), elongation=3.5),
+        'cotton_bolls': lambda rng: blobs(rng, (240, 238, 232), (110, 90, 70), 22, (14, 22), highlight=False,
+                                          stems=(90, 70, 50)),
+        'rice_grains': lambda rng: blobs(rng, (235, 230, 215), (200, 198, 190), 220, (3, 4), elongation=2.2,
+                                         highlight=False),
+        'onions': lambda rng: blobs(rng, (150, 60, 90), (180, 160, 130), 12, (25, 35)),
+    },
+    'not_crop': {
+        'solid_green': lambda rng: canvas((40, 160, 60)),
+        'green_plastic_bucket': lambda rng: plastic_object(rng, (40, 170, 70), (200, 200, 195)),
+        'green_tarp': lambda rng: plastic_object(rng, (30, 120, 60), (30, 120, 60)),
+        'blue_sky': sky,
+        'blue_denim': lambda rng: fabric(rng, (60, 90, 150)),
+        'purple_fabric': lambda rng: fabric(rng, (120, 60, 150)),
+        'text_document': text_page,
+        'concrete': lambda rng: noise_texture(rng, (150, 150, 148), 14),
+        'red_bricks': bricks,
+        'red_plastic_chair': lambda rng: plastic_object(rng, (200, 40, 35), (220, 220, 215)),
+        'white_wall': lambda rng: canvas((238, 236, 232)),
+        'black_screen': lambda rng: canvas((10, 10, 12)),
+    },
+}
+
+
+def main():
+    for label, makers in IMAGES.items():
+        folder = os.path.join(HERE, label)
+        os.makedirs(folder, exist_ok=True)
+        for index, (name, make) in enumerate(sorted(makers.items())):
+            rng = np.random.default_rng(index + (100 if label == 'crop' else 200))
+            image = finish(make(rng), rng)
+            image.save(os.path.join(folder, f'{name}.jpg'), quality=85)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+def profile(app_module, user_id):
+    return app_module.db.collection('users').document(user_id).collection('profile').document('info').get().to_dict()
+
+
+def test_batch_profile_update_matches_the_endpoint(app_module, client):
+    existing = {'name': 'Asha', 'farm': {'soil': 'loam', 'irrigation': 'drip'}, 'prefs': {'units': 'metric'}}
+    updates = {'farm': {'soil': 'clay'}, 'prefs.language': 'hi'}
+    for user_id in ('farmer-endpoint', 'farmer-batch'):
+        app_module.db.collection('users').document(user_id).collection('profile').document('info').set(existing)
+
+    assert client.post('/update_farmer_profile', json={'userId': 'farmer-endpoint', 'updates': updates}).status_code == 200
+    response = client.post('/batch', json={'userId': 'farmer-batch', 'operations': [
+        {'op': 'updateProfile', 'updates': updates},
+    ]})
+
+    assert response.get_json()['results'][0]['status'] == 'ok'
+    # update(): the farm map is replaced and the dotted key reaches into prefs
+    assert profile(app_module, 'farmer-batch') == profile(app_module, 'farmer-endpoint') == {
+        'name': 'Asha', 'farm': {'soil': 'clay'}, 'prefs': {'units': 'metric', 'language': 'hi'}
+    }
+
+
+def test_batch_creates_a_missing_profile_without_failing_its_neighbours(app_module, client):
+    response = client.post('/batch', json={'userId': 'farmer-new', 'operations': [
+        {'op': 'addCrop', 'cropData': [{'name': 'rice'}]},
+        {'op': 'updateProfile', 'updates': {'name': 'Ravi', 'location': '20.5,77.1'}},
+        {'op': 'updateProfile', 'updates': {'phone': '98765'}},
+    ]})
+
+    assert [result['status'] for result in response.get_json()['results']] == ['ok', 'ok', 'ok']
+    assert profile(app_module, 'farmer-new') == {**app_module.DEFAULT_PROFILE_FIELDS,
+                                                 'name': 'Ravi', 'location': '20.5,77.1', 'phone': '98765'}
+    assert 'geoTile' in app_module.db.collection('users').document('farmer-new').get().to_dict()
@@ -0,0 +1,87 @@
+import sqlite3
+import time
+
+import pytest
+
+from cache_backends import MemoryBackend, SQLiteBackend
+from cache_manager import CacheManager
+from swr_store import StaleWhileRevalidateStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+def test_sqlite_entries_expire(path):
+    cache = SQLiteBackend(path)
+    cache.set('weather', {'temp': 31}, 0.05)
+    assert cache.get('weather') == {'temp': 31}
+
+    time.sleep(0.1)
+    assert cache.get('weather') is None
+
+
+def test_sqlite_evicts_least_recently_used_past_max_bytes(path):
+    cache = SQLiteBackend(path, max_bytes=100, evict_every=1)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, 'x' * 38, 60)   # 40 bytes of JSON each
+        time.sleep(0.01)
+
+    assert cache.get('a') is None
+    assert cache.get('b') and cache.get('c')
+    total = sqlite3.connect(path).execute("SELECT SUM(size) FROM cache").fetchone()[0]
+    assert total <= 100
+
+
+def test_sqlite_lease_is_released_when_compute_fails(path):
+    cache = SQLiteBackend(path, lease_ttl=30)
+
+    def failing():
+        raise RuntimeError('Gemini unavailable')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('answer', 60, failing)
+
+    # A waiting worker would otherwise sit out the whole 30 s lease
+    started = time.monotonic()
+    assert SQLiteBackend(path).get_or_compute('answer', 60, lambda: 'ok') == 'ok'
+    assert time.monotonic() - started < 1
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM leases").fetchone()[0] == 0
+
+
+def test_sqlite_instances_on_one_file_share_entries(path):
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    first.set('tile', [1, 2], 60)
+    assert second.get('tile') == [1, 2]
+
+    calls = []
+    first.get_or_compute('answer', 60, lambda: calls.append(1) or 'computed once')
+    assert second.get_or_compute('answer', 60, lambda: calls.append(1) or 'again') == 'computed once'
+    assert len(calls) == 1
+
+    second.delete('tile')
+    assert first.get('tile') is None
+
+
+def test_swr_store_serves_another_workers_value(path):
+    loads = []
+    first = StaleWhileRevalidateStore('weather', 60, 60, backend=SQLiteBackend(path))
+    second = StaleWhileRevalidateStore('weather', 60, 60, backend=SQLiteBackend(path))
+
+    first.get(('tile', 1), lambda: loads.append(1) or {'temp': 31})
+    value, age = second.get(('tile', 1), lambda: loads.append(1) or {'temp': 0})
+
+    assert value == {'temp': 31} and age < 60
+    assert len(loads) == 1
+
+
+def test_memory_get_or_compute_counts_one_miss():
+    cache = MemoryBackend()
+    cache.account = CacheManager(10_000_000).register('shared', 100, cache.discard)
+
+    cache.get_or_compute('answer', 60, lambda: 'computed')
+    cache.get_or_compute('answer', 60, lambda: 'computed')
+
+    stats = cache.account.stats()
+    assert (stats['hits'], stats['misses'], stats['hitRatio']) == (1, 1, 0.5)
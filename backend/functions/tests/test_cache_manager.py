@@ -0,0 +1,37 @@
+from cache_backends import MemoryBackend
+from cache_manager import CacheManager
+from swr_store import StaleWhileRevalidateStore
+
+
+def register(manager, name, cache, cost):
+    cache.account = manager.register(name, cost, cache.discard)
+    return cache
+
+
+def test_cheap_entries_are_evicted_first():
+    manager = CacheManager(max_bytes=200_000)
+    weather = register(manager, 'weather', StaleWhileRevalidateStore('weather', 60, 60), 10)
+    gemini = register(manager, 'shared', MemoryBackend(), 100)
+
+    gemini.set('answer', 'g' * 50_000, 60)
+    for i in range(10):
+        weather.get(i, lambda: 'w' * 20_000)
+
+    assert manager.total_bytes() <= 200_000
+    assert gemini.get('answer') is not None
+    assert manager.stats()['caches']['weather']['evictions'] > 0
+
+
+def test_reservations_do_not_force_evictions():
+    manager = CacheManager(max_bytes=100_000)
+    store = register(manager, 'weather', StaleWhileRevalidateStore('weather', 60, 60), 10)
+    manager.register('fixed', 1, lambda key: None).reserve(10_000_000)
+
+    loads = []
+    for _ in range(3):
+        store.get('tile', lambda: loads.append(1) or 'value')
+
+    assert len(loads) == 1
+    stats = manager.stats()
+    assert stats['caches']['weather']['entries'] == 1
+    assert stats['reservedBytes'] == 10_000_000
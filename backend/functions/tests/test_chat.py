@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import chat_archive
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def semantic_cache(app_module, monkeypatch):
+    cache = SemanticCache()
+    monkeypatch.setattr(app_module, 'semantic_cache', cache)
+    return cache
+
+
+def chat(client, user_id, message, chat_id=None):
+    return client.post('/chat', json={'user_id': user_id, 'message': message, 'chat_id': chat_id}).get_json()
+
+
+def test_answers_shaped_by_history_are_never_shared(app_module, client, semantic_cache, monkeypatch):
+    first = chat(client, 'farmer-a', 'My wife is pregnant and feels dizzy')
+    monkeypatch.setattr(app_module, 'generate_with_gemini', lambda contents, cache_ttl=None, parse=None:
+                        'Since your wife is pregnant, rest in the shade.')
+    chat(client, 'farmer-a', 'What should I do about heat on the farm?', first['chat_id'])
+
+    assert semantic_cache.lookup('What should I do about heat on the farm?') is None
+    reply = chat(client, 'farmer-b', 'What should I do about heat on the farm?')
+    assert not reply['from_cache']
+
+
+def test_follow_ups_do_not_read_the_cache(client, semantic_cache):
+    semantic_cache.store('How do I treat a cut from a sickle?', 'Clean it with water.')
+    first = chat(client, 'farmer-c', 'Hello')
+
+    reply = chat(client, 'farmer-c', 'How do I treat a cut from a sickle?', first['chat_id'])
+    assert not reply['from_cache']
+    assert chat(client, 'farmer-d', 'How do I treat a cut from a sickle?')['from_cache']
+
+
+def test_chat_archived_while_gemini_answers_keeps_every_message(app_module, client, tmp_path, monkeypatch):
+    store = chat_archive.LocalBlobStore(str(tmp_path))
+    store.durable = True
+    monkeypatch.setattr(app_module, 'chat_blob_store', store)
+    old = datetime.now() - timedelta(days=40)
+    app_module.db.collection('users').document('farmer-e').collection('chats').document('chat-old').set({
+        'createdAt': old, 'updatedAt': old, 'lastMessage': 'Rest well.',
+        'messages': [{'sender': 'user', 'message': 'I have a fever', 'timestamp': old},
+                     {'sender': 'bot', 'message': 'Rest well.', 'timestamp': old}]
+    })
+
+    def gemini_while_archiving(contents, cache_ttl=None, parse=None):
+        # The nightly archive run lands between /chat's read and its write
+        report = chat_archive.archive_cold_chats(app_module.db, 'farmer-e', store, 30)
+        assert report['documentsArchived'] == 1
+        return 'Drink plenty of water.'
+
+    monkeypatch.setattr(app_module, 'generate_with_gemini', gemini_while_archiving)
+    chat(client, 'farmer-e', 'It is worse today', 'chat-old')
+
+    stored = app_module.db.collection('users').document('farmer-e').collection('chats').document('chat-old').get()
+    assert not stored.to_dict().get('archived')
+    assert [m['message'] for m in stored.to_dict()['messages']] == [
+        'I have a fever', 'Rest well.', 'It is worse today', 'Drink plenty of water.'
+    ]
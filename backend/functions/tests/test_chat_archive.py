@@ -0,0 +1,38 @@
+import pytest
+
+import chat_archive
+from chat_archive import ArchiveNotConfigured, LocalBlobStore, PreconditionFailed, merge_into_archive, read_archive
+
+
+def test_refuses_to_archive_without_durable_storage(tmp_path):
+    for store in (None, LocalBlobStore(str(tmp_path))):
+        with pytest.raises(ArchiveNotConfigured):
+            chat_archive.archive_cold_chats(db=None, user_id='u1', blob_store=store, older_than_days=30)
+
+
+def test_put_checks_generation(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    store.put('chats/u1', b'first', if_generation=None)
+    with pytest.raises(PreconditionFailed):
+        store.put('chats/u1', b'second', if_generation=None)
+    store.put('chats/u1', b'second', if_generation=chat_archive.generation_of(b'first'))
+    assert store.get('chats/u1') == b'second'
+
+
+def test_concurrent_merge_keeps_both_runs_records(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    key = chat_archive.archive_key('u1', '.jsonl.gz')
+    original_put = store.put
+    raced = []
+
+    def racing_put(key, data, if_generation=False):
+        # Another archive run lands its blob between our read and our write
+        if not raced:
+            raced.append(True)
+            merge_into_archive(store, key, {'other': {'chatId': 'other', 'messages': []}})
+        original_put(key, data, if_generation)
+
+    store.put = racing_put
+    merge_into_archive(store, key, {'mine': {'chatId': 'mine', 'messages': []}})
+
+    assert set(read_archive(store, key)) == {'mine', 'other'}
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import wait
+
+from conftest import WEATHER
+
+
+def seed(app_module, user_id):
+    user = app_module.db._target.collection('users').document(user_id)
+    user.collection('profile').document('info').set({**app_module.DEFAULT_PROFILE_FIELDS, 'name': 'Asha'})
+    user.collection('crops').document('crop-1').set({'name': 'wheat', 'type': 'cereal', 'sowedDate': '2026-09-01'})
+
+
+def dashboard(client, user_id):
+    response = client.get('/dashboard', query_string={'userId': user_id, 'lat': 20, 'lon': 77})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_every_section_is_reported(app_module, client):
+    seed(app_module, 'farmer-home')
+    body = dashboard(client, 'farmer-home')
+
+    assert set(body) == {'success', 'userId', 'profile', 'crops', 'weather', 'dailySuggestion'}
+    assert body['profile'] == {'success': True, 'profile': {**app_module.DEFAULT_PROFILE_FIELDS, 'name': 'Asha'}}
+    assert [crop['id'] for crop in body['crops']['crops']] == ['crop-1']
+    assert body['weather']['success'] and body['weather']['location'] == {'lat': 20, 'lon': 77}
+    assert body['dailySuggestion']['success'] and body['dailySuggestion']['language'] == 'en'
+    assert set(body['dailySuggestion']['suggestion']) >= {'heading', 'body'}
+
+
+def test_a_failing_upstream_degrades_only_its_section(app_module, client, monkeypatch):
+    seed(app_module, 'farmer-no-weather')
+    monkeypatch.setattr(app_module, 'get_weather_data_with_age', lambda lat, lon: (None, None))
+
+    def broken_get_all(refs, *args, **kwargs):
+        raise RuntimeError('Firestore unavailable')
+    monkeypatch.setattr(app_module.db, 'get_all', broken_get_all)
+
+    body = dashboard(client, 'farmer-no-weather')
+    assert body['success']
+    assert body['weather'] == {'success': False, 'error': 'Failed to fetch weather data'}
+    assert body['profile'] == {'success': False, 'error': 'Firestore unavailable'}
+    assert body['crops']['success']
+    # Falls back to the local rules rather than failing the suggestion too
+    assert body['dailySuggestion']['success']
+
+
+def test_slow_sections_time_out_without_holding_the_response(app_module, client, monkeypatch):
+    seed(app_module, 'farmer-slow')
+    monkeypatch.setattr(app_module, 'DASHBOARD_DEADLINES',
+                        {**app_module.DASHBOARD_DEADLINES, 'weather': 0.2, 'dailySuggestion': 0.4})
+    released = threading.Event()
+
+    def slow_weather(lat, lon):
+        released.wait(5)
+        return WEATHER, 0
+    monkeypatch.setattr(app_module, 'get_weather_data_with_age', slow_weather)
+
+    # Track the section futures so they finish before the fakes are torn down
+    futures = []
+    submit = app_module.dashboard_pool.submit
+    monkeypatch.setattr(app_module.dashboard_pool, 'submit', lambda *args: futures.append(submit(*args)) or futures[-1])
+
+    started = time.monotonic()
+    body = dashboard(client, 'farmer-slow')
+    elapsed = time.monotonic() - started
+    released.set()
+    wait(futures)
+
+    assert elapsed < 1
+    assert body['weather'] == {'success': False, 'error': 'Timed out'}
+    assert body['dailySuggestion'] == {'success': False, 'error': 'Timed out'}
+    assert body['profile']['success'] and body['crops']['success']
@@ -0,0 +1,104 @@
+import io
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from google.cloud import firestore
+
+from db_instrumentation import InstrumentedClient, assert_within_budget, usage_scope
+
+
+def seed(app, user_id):
+    """A user with a profile, one crop, one deleted crop and one chat, written straight to the fake (not counted)"""
+    user = app.db._target.collection('users').document(user_id)
+    user.collection('profile').document('info').set({**app.DEFAULT_PROFILE_FIELDS, 'name': 'Asha', 'language': 'hi'})
+    user.collection('crops').document('crop-1').set(
+        {'name': 'wheat', 'type': 'cereal', 'sowedDate': '2024-01-01', 'updatedAt': datetime.now(timezone.utc)}
+    )
+    user.collection('tombstones').document('crop-crop-0').set(
+        {'kind': 'crop', 'itemId': 'crop-0', 'deletedAt': firestore.SERVER_TIMESTAMP}
+    )
+    user.collection('chats').document('chat-1').set({
+        'createdAt': datetime.now(), 'updatedAt': datetime.now(), 'lastMessage': 'hi',
+        'messages': [{'sender': 'user', 'message': 'hi', 'timestamp': datetime.now()}]
+    })
+
+
+def since_yesterday(app):
+    return app.encode_sync_token(datetime.now(timezone.utc) - timedelta(days=1))
+
+
+# endpoint -> request exercising its most expensive common path, for a seeded user "u"
+SCENARIOS = {
+    'medical_chat': lambda c, app, u: c.post('/chat', json={'user_id': u, 'chat_id': 'chat-1', 'message': 'How often should I water wheat?'}),
+    'analyze_image': lambda c, app, u: c.post('/analyze_image', data={
+        'user_id': u, 'chat_id': 'chat-1', 'image': (io.BytesIO(b'not really a jpeg'), 'leaf.jpg', 'image/jpeg')
+    }),
+    'add_crop': lambda c, app, u: c.post('/addCrop', json={'user_id': u, 'cropData': [{'name': 'rice'}, {'name': 'maize'}]}),
+    'update_crop': lambda c, app, u: c.put('/updateCrop', json={'user_id': u, 'cropId': 'crop-1', 'cropData': {'area': '2'}}),
+    'delete_crop': lambda c, app, u: c.delete('/deleteCrop', json={'user_id': u, 'cropId': 'crop-1'}),
+    'get_crops': lambda c, app, u: c.get('/getCrops', query_string={'userId': u}),
+    'sync': lambda c, app, u: c.get('/sync', query_string={'userId': u, 'since': since_yesterday(app)}),
+    'get_daily_suggestion': lambda c, app, u: c.get('/getDailySuggestion', query_string={'userId': u, 'lat': 20, 'lon': 77}),
+    'get_suggestions': lambda c, app, u: c.get('/getSuggestions', query_string={'userId': u, 'lat': 20, 'lon': 77}),
+    'dashboard': lambda c, app, u: c.get('/dashboard', query_string={'userId': u, 'lat': 20, 'lon': 77}),
+    'get_chats': lambda c, app, u: c.get('/getChats', query_string={'userId': u}),
+    'get_chat': lambda c, app, u: c.get('/getChat', query_string={'userId': u, 'chatId': 'chat-1'}),
+    'delete_all_chats': lambda c, app, u: c.delete('/deleteAllChats', json={'userId': u}),
+    'batch_operations': lambda c, app, u: c.post('/batch', json={'userId': u, 'operations': [
+        {'op': 'addCrop', 'cropData': [{'name': 'rice'}]},
+        {'op': 'updateCrop', 'cropId': 'crop-1', 'cropData': {'area': '3'}},
+        {'op': 'updateProfile', 'updates': {'name': 'Asha Devi', 'location': '20.5,77.1'}},
+        {'op': 'deleteAllChats'},
+    ]}),
+    'get_farmer_profile': lambda c, app, u: c.get('/get_farmer_profile', query_string={'userId': u}),
+    # A farmer without a profile yet: the update fails and the profile is created
+    'update_farmer_profile': lambda c, app, u: c.post('/update_farmer_profile', json={
+        'userId': u + '-new', 'updates': {'name': 'Ravi', 'location': '20.5,77.1'}
+    }),
+    'get_weather': lambda c, app, u: c.get('/weather', query_string={'lat': 20, 'lon': 77}),
+    'home': lambda c, app, u: c.get('/'),
+    'health': lambda c, app, u: c.get('/health'),
+}
+
+
+def test_every_endpoint_has_a_budget_and_a_scenario(app_module):
+    endpoints = {rule.endpoint for rule in app_module.app.url_map.iter_rules()
+                 if rule.endpoint != 'static' and not rule.rule.startswith('/debug')}
+    assert endpoints <= set(app_module.FIRESTORE_BUDGETS)
+    assert set(app_module.FIRESTORE_BUDGETS) == set(SCENARIOS)
+
+
+@pytest.mark.parametrize('endpoint', sorted(SCENARIOS))
+def test_endpoint_stays_within_budget(app_module, client, endpoint):
+    user_id = f'farmer-{endpoint}'
+    seed(app_module, user_id)
+
+    with usage_scope() as usage:
+        response = SCENARIOS[endpoint](client, app_module, user_id)
+
+    assert response.status_code < 300, response.get_data(as_text=True)
+    assert_within_budget(usage, app_module.FIRESTORE_BUDGETS[endpoint], endpoint)
+
+
+def test_streams_are_counted_as_the_caller_reads_them():
+    produced = []
+
+    class Collection:
+        _path = ('users',)
+
+        def stream(self):
+            for index in range(3):
+                produced.append(index)
+                yield SimpleNamespace(exists=True, reference=SimpleNamespace(path=f'users/{index}'),
+                                      to_dict=lambda: {'geoTile': 'tsq4n'})
+
+    db = InstrumentedClient(SimpleNamespace(collection=lambda *path: Collection()), lambda *args: None)
+    with usage_scope() as usage:
+        docs = db.collection('users').stream()
+        next(docs)
+        assert produced == [0]   # nothing read ahead of the caller
+        assert len(list(docs)) == 2
+
+    counts = usage.to_dict()
+    assert (counts['roundTrips'], counts['reads']) == (1, 3)
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from forecast_features import daily_agro_features, extraterrestrial_radiation, summarize_features
+
+
+def forecast(start, steps):
+    """3-hourly OpenWeather items from start (UTC), each step (temp, humidity, rain mm)"""
+    base = int(start.replace(tzinfo=timezone.utc).timestamp())
+    items = []
+    for index, (temp, humidity, rain) in enumerate(steps):
+        item = {'dt': base + index * 3 * 3600, 'main': {'temp_min': temp, 'temp_max': temp, 'humidity': humidity}}
+        if rain:
+            item['rain'] = {'3h': rain}
+        items.append(item)
+    return items
+
+
+# Starts mid-afternoon, so the first day has only three readings
+ITEMS = forecast(datetime(2026, 6, 1, 15), [
+    (34, 40, 0), (30, 60, 0), (26, 92, 0),
+    (22, 95, 1.5), (21, 96, 2.5), (25, 85, 0), (31, 60, 0), (35, 40, 0), (36, 35, 0), (30, 70, 0), (27, 91, 0),
+    (24, 90, 10), (23, 93, 12.5),
+])
+
+
+def test_readings_are_bucketed_by_local_day():
+    days = daily_agro_features(ITEMS, lat=20)
+
+    assert [day['date'] for day in days] == ['2026-06-01', '2026-06-02', '2026-06-03']
+    assert [day['hours_covered'] for day in days] == [9, 24, 6]
+    first, second, third = days
+    assert (first['temp_min'], first['temp_max'], first['rain'], first['humid_hours']) == (26, 34, 0, 3)
+    assert (second['temp_min'], second['temp_max'], second['rain'], second['humid_hours']) == (21, 36, 4, 9)
+    assert (third['rain'], third['humid_hours']) == (22.5, 6)
+    assert second['gdd'] == 18.5   # (21 + 36) / 2 - 10
+
+
+def test_utc_offset_moves_late_readings_into_the_next_day():
+    # 21:00 UTC is 02:30 the next morning in India
+    days = daily_agro_features(ITEMS, lat=20, utc_offset=5 * 3600 + 1800)
+    assert [day['hours_covered'] for day in days] == [6, 24, 9]
+
+
+def test_extraterrestrial_radiation_matches_fao56():
+    # FAO-56 example 8: 20°S on 3 September (day 246) receives 32.2 MJ m-2 day-1
+    assert extraterrestrial_radiation(-20, 246) == pytest.approx(32.2, abs=0.1)
+
+
+def test_et0_follows_hargreaves():
+    day = daily_agro_features(ITEMS, lat=20)[1]
+    ra = extraterrestrial_radiation(20, 153)
+    expected = 0.0023 * 0.408 * ra * ((21 + 36) / 2 + 17.8) * (36 - 21) ** 0.5
+    assert day['et0'] == pytest.approx(expected, abs=0.05)
+    assert 5 < day['et0'] < 8
+
+    # No diurnal range, no evaporative demand under Hargreaves
+    flat = daily_agro_features(forecast(datetime(2026, 6, 1), [(25, 50, 0)] * 8), lat=20)
+    assert flat[0]['et0'] == 0
+
+
+def test_empty_forecast():
+    assert daily_agro_features([], lat=20) == []
+
+
+def test_summary_lists_the_requested_days():
+    summary = summarize_features(daily_agro_features(ITEMS, lat=20), days=2)
+    lines = summary.splitlines()
+
+    assert len(lines) == 3
+    assert lines[2].startswith('- 06-02: 21/36 | 4 | 9 | 18.5 | ')
+
+
+@pytest.mark.parametrize('rain_by_day, irrigation_tip', [
+    ([12, 10, 0], True),    # 22 mm over the next two days
+    ([5, 0, 60], False),    # heavy rain only on the third day
+])
+def test_fallback_skips_irrigation_before_two_days_of_rain(app_module, rain_by_day, irrigation_tip):
+    daily = [{'date': f'2026-06-0{i + 1}', 'temp_min': 20, 'temp_max': 28, 'rain': rain, 'humid_hours': 0,
+              'gdd': 14, 'et0': 4} for i, rain in enumerate(rain_by_day)]
+    weather = {'current': {'temperature': 26, 'humidity': 60}, 'daily': daily}
+
+    tip = app_module.generate_fallback_suggestions([{'name': 'wheat', 'days_old': 20}], weather)[0]
+    assert (tip['category'] == 'irrigation' and tip['priority'] == 'high') == irrigation_tip
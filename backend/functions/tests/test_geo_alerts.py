@@ -0,0 +1,93 @@
+import pytest
+
+from db_instrumentation import usage_scope
+from geo_alerts import evaluate_alerts, geohash_center, geohash_encode, parse_coordinates
+
+
+@pytest.mark.parametrize('lat, lon, geohash', [
+    (57.64911, 10.40744, 'u4pru'),      # the usual reference vector (u4pruydqqvj)
+    (42.605, -5.603, 'ezs42'),
+    (-25.382708, -49.265506, '6gkzw'),
+])
+def test_geohash_known_vectors(lat, lon, geohash):
+    assert geohash_encode(lat, lon) == geohash
+    assert geohash_encode(*geohash_center(geohash)) == geohash
+
+
+def test_geohash_center_is_inside_the_cell():
+    lat, lon = geohash_center('u4pru')
+    assert abs(lat - 57.64911) < 0.03 and abs(lon - 10.40744) < 0.03
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('20.5,77.1', (20.5, 77.1)),
+    (' -33.9 , 18.4 ', (-33.9, 18.4)),
+    ('90,180', (90.0, 180.0)),
+    ('90.1,0', None),
+    ('0,-180.5', None),
+    ('Agra, Uttar Pradesh', None),
+    ('1,2,3', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_coordinates(text, expected):
+    assert parse_coordinates(text) == expected
+
+
+def day(date, rain=0, temp_max=30, temp_min=20):
+    return {'date': date, 'rain': rain, 'temp_max': temp_max, 'temp_min': temp_min}
+
+
+def test_alert_thresholds_are_inclusive():
+    daily = {
+        'at': [day('d1', rain=50, temp_max=40, temp_min=2)],
+        'below': [day('d1', rain=49.9, temp_max=39.9, temp_min=2.1)],
+    }
+    alerts = evaluate_alerts(['at', 'below'], daily)
+
+    assert sorted(alert['kind'] for alert in alerts['at']) == ['frost', 'heat_wave', 'heavy_rain']
+    assert 'below' not in alerts
+
+
+def test_alerts_report_the_first_day_and_tolerate_short_forecasts():
+    daily = {
+        'long': [day('d1'), day('d2', rain=60), day('d3', rain=80)],
+        'short': [day('d1', temp_max=41)],
+        'none': [],
+    }
+    alerts = evaluate_alerts(['long', 'short', 'none'], daily)
+
+    assert alerts == {
+        'long': [{'kind': 'heavy_rain', 'date': 'd2', 'value': 60.0}],
+        'short': [{'kind': 'heat_wave', 'date': 'd1', 'value': 41.0}],
+    }
+    assert evaluate_alerts(['none'], daily) == {}
+
+
+def test_alert_job_reads_tiles_not_users(app_module, monkeypatch):
+    rainy, dry = geohash_encode(20.0, 77.0), geohash_encode(28.6, 77.2)
+    for index in range(5):
+        app_module.update_user_activity(f'farmer-dry-{index}', 28.6, 77.2)
+    app_module.update_user_activity('farmer-rain', 20.0, 77.0)
+    app_module.update_user_activity('farmer-moved', 20.0, 77.0)
+    # Moves while another worker serves it, so the rainy tile still lists it
+    app_module.recent_activity.clear()
+    app_module.update_user_activity('farmer-moved', 28.6, 77.2)
+
+    def weather(lat, lon):
+        rain = 70 if geohash_encode(lat, lon) == rainy else 0
+        return {'daily': [day('2026-07-01', rain=rain)]}, 0
+    monkeypatch.setattr(app_module, 'get_weather_data_with_age', weather)
+
+    with usage_scope() as usage:
+        report = app_module.run_weather_alerts()
+
+    assert report['tiles'] == 2 and report['alertsWritten'] == 1
+    # Two tile documents, then the two members listed under the alerted tile
+    assert usage.to_dict()['reads'] == 4
+    users = app_module.db.collection('users')
+    assert users.document('farmer-rain').collection('alerts').document('heavy_rain-2026-07-01').get().exists
+    assert not users.document('farmer-moved').collection('alerts').document('heavy_rain-2026-07-01').get().exists
+    members = lambda tile: app_module.db.collection('geoTiles').document(tile).get().to_dict()['members']
+    assert members(rainy) == ['farmer-rain']
+    assert 'farmer-moved' in members(dry)
@@ -0,0 +1,64 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def seed_crops(app_module, user_id, count):
+    crops = app_module.db._target.collection('users').document(user_id).collection('crops')
+    for index in range(count):
+        crops.document(f'crop-{index}').set({'name': f'wheat field {index}', 'type': 'cereal', 'area': '2 acres'})
+
+
+def get_crops(client, user_id, **headers):
+    return client.get('/getCrops', query_string={'userId': user_id}, headers=headers)
+
+
+@pytest.fixture
+def stub_brotli(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'brotli', SimpleNamespace(compress=lambda data, quality: b'br:' + data))
+
+
+def test_unchanged_crops_get_a_304(app_module, client):
+    seed_crops(app_module, 'farmer-etag', 2)
+    first = get_crops(client, 'farmer-etag', **{'Accept-Encoding': 'identity'})
+    etag = first.headers['ETag']
+
+    again = get_crops(client, 'farmer-etag', **{'If-None-Match': etag, 'Accept-Encoding': 'identity'})
+    assert again.status_code == 304 and again.headers['ETag'] == etag
+
+    seed_crops(app_module, 'farmer-etag', 3)
+    assert get_crops(client, 'farmer-etag', **{'If-None-Match': etag}).status_code == 200
+
+
+def test_each_encoding_has_its_own_etag(app_module, client, stub_brotli):
+    seed_crops(app_module, 'farmer-encodings', 20)
+    plain = get_crops(client, 'farmer-encodings', **{'Accept-Encoding': 'identity'})
+    zipped = get_crops(client, 'farmer-encodings', **{'Accept-Encoding': 'gzip'})
+    squeezed = get_crops(client, 'farmer-encodings', **{'Accept-Encoding': 'br, gzip'})
+
+    tag = plain.headers['ETag'].strip('"')
+    assert 'Content-Encoding' not in plain.headers
+    assert zipped.headers['Content-Encoding'] == 'gzip' and zipped.headers['ETag'] == f'"{tag}-gzip"'
+    assert squeezed.headers['Content-Encoding'] == 'br' and squeezed.headers['ETag'] == f'"{tag}-br"'
+    assert 'Accept-Encoding' in zipped.headers['Vary']
+    assert json.loads(gzip.decompress(zipped.get_data())) == plain.get_json()
+
+
+def test_304_echoes_the_compressed_validator(app_module, client):
+    seed_crops(app_module, 'farmer-gzip', 20)
+    etag = get_crops(client, 'farmer-gzip', **{'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    again = get_crops(client, 'farmer-gzip', **{'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+
+def test_small_bodies_are_not_compressed(app_module, client, stub_brotli):
+    seed_crops(app_module, 'farmer-small', 1)
+    response = get_crops(client, 'farmer-small', **{'Accept-Encoding': 'br, gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert not response.headers['ETag'].endswith('-gzip"')
@@ -0,0 +1,35 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PIL')
+from PIL import Image
+
+from plant_gate import PlantGate, evaluate
+
+EVAL_DIR = os.path.join(os.path.dirname(__file__), 'plant_gate_eval')
+
+
+def jpeg(rgb):
+    buffer = io.BytesIO()
+    Image.fromarray(rgb.astype(np.uint8)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def test_no_local_mistakes_on_the_evaluation_set():
+    report = evaluate(EVAL_DIR, PlantGate())
+    assert report['mistakes'] == []
+    assert report['decided_locally'] > 0
+
+
+@pytest.mark.parametrize('name', ['tomatoes', 'red_chillies', 'cotton_bolls', 'rice_grains'])
+def test_red_and_white_produce_is_escalated(name):
+    with open(os.path.join(EVAL_DIR, 'crop', f'{name}.jpg'), 'rb') as f:
+        assert PlantGate().classify(f.read()) is None
+
+
+@pytest.mark.parametrize('colour', [(40, 160, 60), (200, 40, 35), (240, 240, 240), (128, 128, 128)])
+def test_solid_colours_are_escalated(colour):
+    assert PlantGate().classify(jpeg(np.full((128, 128, 3), colour))) is None
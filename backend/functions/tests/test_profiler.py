@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+
+import profiler
+
+
+@pytest.fixture
+def debug(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'DEBUG_TOKEN', 'secret')
+    monkeypatch.setattr(app_module, 'profile_sessions', profiler.ProfileSessions())
+    return {'X-Debug-Token': 'secret'}
+
+
+def test_profile_never_blocks_the_worker(app_module, client, debug, monkeypatch):
+    released = threading.Event()
+
+    def slow_samples(seconds):
+        released.wait(5)
+        return 'app.py:1;app.py:2 3'
+    monkeypatch.setattr(profiler, 'sample_stacks', slow_samples)
+
+    started = time.monotonic()
+    response = client.get('/debug/profile', query_string={'seconds': 5, 'wait': 1}, headers=debug)
+    assert time.monotonic() - started < 1
+    assert response.status_code == 202
+    url = response.get_json()['result']
+
+    assert client.get(url, query_string={'wait': 1}, headers=debug).status_code == 202
+    released.set()
+    deadline = time.monotonic() + 5
+    while (result := client.get(url, headers=debug)).status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert result.get_data(as_text=True) == 'app.py:1;app.py:2 3'
+
+
+def test_profile_needs_the_debug_token(client):
+    assert client.get('/debug/profile').status_code == 404
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from rate_limit import ConcurrencyGate, TokenBucketLimiter
+
+
+def test_gate_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    # Two gunicorn workers on one host, each with its own gate object
+    first, second = ConcurrencyGate({'gemini': 2}, db_path=path), ConcurrencyGate({'gemini': 2}, db_path=path)
+
+    slots = [first.acquire('gemini'), second.acquire('gemini')]
+    assert all(slots)
+    assert second.acquire('gemini', timeout=0.1) is None
+
+    first.release('gemini', slots[0])
+    assert second.acquire('gemini', timeout=0.1)
+
+
+def test_gate_reclaims_slots_of_dead_workers(tmp_path):
+    gate = ConcurrencyGate({'hf': 1}, db_path=str(tmp_path / 'limits.db'), lease=0)
+    assert gate.acquire('hf')
+    # Never released, but its lease has run out
+    assert gate.acquire('hf', timeout=0.1)
+
+
+def test_shared_buckets_are_pruned_once_full(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    limiter = TokenBucketLimiter(rate=1000, capacity=10, db_path=path)
+    for index in range(50):
+        limiter.take(f'ip:10.0.0.{index}', 1)
+
+    time.sleep(0.05)         # every bucket above refills in 10 ms
+    limiter._pruned_at = 0   # and the next take is due a sweep
+    limiter.take('user:farmer', 1)
+
+    keys = [key for (key,) in sqlite3.connect(path).execute("SELECT key FROM buckets")]
+    assert keys == ['user:farmer']
+
+
+def test_busy_upstream_fails_the_request_with_a_retryable_503(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'upstream_gate', ConcurrencyGate({'gemini': 0, 'hf': 0, 'openweather': 0}))
+    monkeypatch.setattr(app_module, 'UPSTREAM_WAIT_SECONDS', 0)
+
+    def gemini_call(contents, cache_ttl=None):
+        with app_module.upstream_slot('gemini'):
+            return 'unreachable'
+
+    monkeypatch.setattr(app_module, 'generate_with_gemini', gemini_call)
+    response = client.post('/chat', json={'user_id': 'farmer-busy', 'message': 'When should I sow wheat?'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+
+
+def test_clients_behind_the_proxy_get_their_own_buckets(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'rate_limiter', TokenBucketLimiter(rate=0.001, capacity=2))
+
+    def weather(ip):
+        return client.get('/weather', query_string={'lat': 20, 'lon': 77}, headers={'X-Forwarded-For': ip})
+
+    assert weather('203.0.113.7').status_code == 200
+    assert weather('203.0.113.7').status_code == 429
+    assert weather('198.51.100.23').status_code == 200
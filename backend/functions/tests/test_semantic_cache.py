@@ -0,0 +1,43 @@
+from semantic_cache import SemanticCache
+
+
+def test_rephrased_question_hits():
+    cache = SemanticCache()
+    cache.store("How to plant wheat?", "how-answer")
+
+    assert cache.lookup("how do I plant wheat")[0] == "how-answer"
+
+
+def test_near_miss_questions_do_not_share_answers():
+    cache = SemanticCache()
+    cache.store("How to plant wheat?", "how-answer")
+
+    for question in ("When to plant wheat?", "Which wheat to plant?", "How to plant rice?"):
+        assert cache.lookup(question) is None, question
+
+
+def test_languages_are_separate():
+    cache = SemanticCache()
+    cache.store("How to plant wheat?", "how-answer", "en")
+
+    assert cache.lookup("How to plant wheat?", "hi") is None
+
+
+def test_lookup_does_not_allocate_partitions():
+    cache = SemanticCache()
+    for language in ('xx', 'yy', 'zz'):
+        assert cache.lookup("How to plant wheat?", language) is None
+    assert cache.stats() == {}
+
+
+def test_partitions_are_capped_and_grow_lazily():
+    cache = SemanticCache(capacity=100, max_partitions=2)
+    for language in ('en', 'hi', 'ta'):
+        cache.store("How to plant wheat?", "answer", language)
+    assert set(cache.stats()) == {'en', 'hi'}
+    assert cache._partitions['en'].vectors.shape[0] < 100
+
+    for i in range(80):
+        cache.store(f"question {i} about crop {i * 7}", f"answer {i}", 'en')
+    assert cache._partitions['en'].vectors.shape[0] == 100
+    assert cache.stats()['en']['entries'] == 81
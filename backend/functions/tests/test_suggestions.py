@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app
+from conftest import fake_gemini
+
+# The real one, before the app_module fixture swaps in fake_gemini
+generate_with_gemini = app.generate_with_gemini
+
+CROPS = [{'name': 'wheat', 'type': 'cereal', 'days_old': 40}]
+
+
+def test_suggestions_without_weather_are_served_but_not_kept(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'get_weather_data', lambda lat, lon: None)
+    suggestion, _ = app_module.daily_suggestion_for('farmer-no-weather', CROPS, 20.0, 77.0)
+
+    assert suggestion['heading'] == 'Water early 💧'
+    key = ('daily', 'farmer-no-weather', app_module.weather_tile(20.0, 77.0), app_module.crops_fingerprint(CROPS))
+    assert app_module.suggestion_store._lookup(key) is None
+
+
+def test_empty_text_suggestions_are_a_failure(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'generate_with_gemini',
+                        lambda contents, cache_ttl=None, parse=None: parse('Sorry, try later.'))
+    with pytest.raises(ValueError):
+        app_module.request_farming_suggestions(CROPS, None)
+
+
+def test_daily_fallback_does_not_call_gemini_again(app_module, monkeypatch):
+    calls = []
+
+    def failing_gemini(contents, cache_ttl=None, parse=None):
+        calls.append(contents)
+        if 'ONE short tip' in contents:
+            raise RuntimeError('Gemini unavailable')
+        return fake_gemini(contents, cache_ttl, parse)
+
+    monkeypatch.setattr(app_module, 'generate_with_gemini', failing_gemini)
+    suggestion, age = app_module.daily_suggestion_for('farmer-gemini-down', CROPS, 20.0, 77.0)
+
+    assert len(calls) == 1
+    assert age == 0 and 'wheat' in suggestion['body']
+
+
+def test_unparseable_gemini_output_is_not_cached(app_module, monkeypatch):
+    replies = iter(['Sorry, I cannot help with that.', json.dumps({'heading': 'Hoe today 🌱', 'body': 'Weed the wheat.'})])
+
+    class Model:
+        def __init__(self, name):
+            pass
+
+        def generate_content(self, contents):
+            return SimpleNamespace(text=next(replies))
+
+    monkeypatch.setattr(app_module.genai, 'GenerativeModel', Model)
+    monkeypatch.setattr(app_module, 'generate_with_gemini', generate_with_gemini)
+    crops = [{'name': 'wheat', 'type': 'cereal', 'days_old': 12}]
+
+    with pytest.raises(ValueError):
+        app_module.request_daily_suggestion(crops, None)
+    assert app_module.request_daily_suggestion(crops, None)['heading'] == 'Hoe today 🌱'
+    # ...and the parsed suggestion is what later requests get from the cache
+    assert app_module.request_daily_suggestion(crops, None)['heading'] == 'Hoe today 🌱'
+
+
+def test_fallback_reuses_the_failed_weather_fetch(app_module, client, monkeypatch):
+    fetches = []
+
+    def failing_weather(lat, lon):
+        fetches.append((lat, lon))
+        raise RuntimeError('OpenWeather unavailable')
+
+    def failing_gemini(contents, cache_ttl=None, parse=None):
+        raise RuntimeError('Gemini unavailable')
+
+    monkeypatch.setattr(app_module, 'fetch_weather_data', failing_weather)
+    monkeypatch.setattr(app_module, 'generate_with_gemini', failing_gemini)
+
+    suggestion, age = app_module.daily_suggestion_for('farmer-offline', CROPS, 21.0, 78.0)
+    assert age == 0 and 'wheat' in suggestion['body']
+    assert len(fetches) == 1
+
+    app_module.db._target.collection('users').document('farmer-offline').collection('crops').document('crop-1').set(
+        {'name': 'wheat', 'type': 'cereal', 'sowedDate': '2026-09-01'}
+    )
+    response = client.get('/getSuggestions', query_string={'userId': 'farmer-offline', 'lat': 22.0, 'lon': 79.0})
+    assert response.status_code == 200 and response.get_json()['success']
+    assert len(fetches) == 2
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def seed(app_module, user_id):
+    """Two crops and two chats last touched a week ago, written straight to the fake"""
+    user = app_module.db._target.collection('users').document(user_id)
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    for crop_id in ('crop-wheat', 'crop-rice'):
+        user.collection('crops').document(crop_id).set({'name': crop_id[5:], 'updatedAt': week_ago})
+    for chat_id in ('chat-1', 'chat-2'):
+        user.collection('chats').document(chat_id).set(
+            {'createdAt': week_ago, 'updatedAt': week_ago, 'lastMessage': 'hi', 'messages': []}
+        )
+
+
+def sync(client, user_id, since=None):
+    query = {'userId': user_id, **({'since': since} if since else {})}
+    response = client.get('/sync', query_string=query)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_snapshot_then_delta_with_tombstones(app_module, client):
+    seed(app_module, 'farmer-sync')
+    snapshot = sync(client, 'farmer-sync')
+    assert snapshot['full']
+    assert {crop['id'] for crop in snapshot['crops']} == {'crop-wheat', 'crop-rice'}
+    assert {chat['chatId'] for chat in snapshot['chats']} == {'chat-1', 'chat-2'}
+
+    client.delete('/deleteCrop', json={'userId': 'farmer-sync', 'cropId': 'crop-rice'})
+    client.put('/updateCrop', json={'userId': 'farmer-sync', 'cropId': 'crop-wheat', 'cropData': {'area': '3'}})
+    client.delete('/deleteAllChats', json={'userId': 'farmer-sync'})
+    delta = sync(client, 'farmer-sync', snapshot['syncToken'])
+
+    assert not delta['full']
+    assert [crop['id'] for crop in delta['crops']] == ['crop-wheat']
+    assert delta['chats'] == []
+    assert delta['deleted'] == {'crops': ['crop-rice'], 'chats': ['chat-1', 'chat-2']}
+
+
+def test_delta_without_changes_is_empty(app_module, client):
+    seed(app_module, 'farmer-quiet')
+    token = app_module.encode_sync_token(datetime.now(timezone.utc) - timedelta(days=1))
+
+    delta = sync(client, 'farmer-quiet', token)
+    assert (delta['full'], delta['crops'], delta['chats']) == (False, [], [])
+    assert delta['deleted'] == {'crops': [], 'chats': []}
+
+
+def test_tokens_older_than_tombstones_get_a_snapshot(app_module, client):
+    seed(app_module, 'farmer-away')
+    too_old = datetime.now(timezone.utc) - timedelta(days=app_module.TOMBSTONE_RETENTION_DAYS + 1)
+
+    response = sync(client, 'farmer-away', app_module.encode_sync_token(too_old))
+    assert response['full'] and len(response['crops']) == 2
+
+
+@pytest.mark.parametrize('token', ['yesterday', '1.5e12', '99999999999999999999999', '-99999999999999999999'])
+def test_bad_tokens_are_rejected(client, token):
+    response = client.get('/sync', query_string={'userId': 'farmer-sync', 'since': token})
+    assert response.status_code == 400
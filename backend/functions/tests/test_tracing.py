@@ -0,0 +1,73 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tracing import Tracer
+
+
+def traced(tracer, body, name='GET /test'):
+    token = tracer.start(name)
+    try:
+        body()
+    finally:
+        tracer.finish(token, status=200)
+
+
+def test_spans_from_pool_threads_attach_to_the_request_trace():
+    tracer = Tracer(slow_threshold=0)
+
+    def work(label):
+        with tracer.span(label):
+            return label
+
+    def request():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            assert pool.submit(tracer.wrap(work), 'wrapped').result() == 'wrapped'
+            pool.submit(work, 'unwrapped').result()
+
+    traced(tracer, request)
+    (trace,) = tracer.traces('slow')
+    assert [span['name'] for span in trace['spans']] == ['wrapped']
+    assert trace['status'] == 200
+
+
+def test_slow_traces_are_kept_and_fast_ones_sampled():
+    tracer = Tracer(sample_rate=1, slow_threshold=60)
+    traced(tracer, lambda: None, 'fast')
+    assert [trace['name'] for trace in tracer.traces('sampled')] == ['fast']
+    assert tracer.traces('slow') == []
+
+    unsampled = Tracer(sample_rate=0, slow_threshold=60)
+    traced(unsampled, lambda: None)
+    assert unsampled.traces('sampled') == [] and unsampled.traces('slow') == []
+
+
+def test_ring_buffers_keep_the_latest_traces():
+    tracer = Tracer(slow_threshold=0, capacity=2)
+    for name in ('first', 'second', 'third'):
+        traced(tracer, lambda: None, name)
+    assert [trace['name'] for trace in tracer.traces('slow')] == ['second', 'third']
+
+
+def test_failed_spans_record_the_error():
+    tracer = Tracer(slow_threshold=0)
+
+    def request():
+        with pytest.raises(ValueError), tracer.span('gemini.generate_content'):
+            raise ValueError('bad reply')
+
+    traced(tracer, request)
+    (span,) = tracer.traces('slow')[0]['spans']
+    assert span['error'] == 'ValueError: bad reply'
+
+
+def test_dashboard_firestore_reads_land_in_the_request_trace(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.tracer, 'slow_threshold', 0)
+    monkeypatch.setattr(app_module.tracer, 'slow', deque(maxlen=10))
+
+    client.get('/dashboard', query_string={'userId': 'farmer-traced', 'lat': 20, 'lon': 77})
+
+    (trace,) = app_module.tracer.traces('slow')
+    # get_all runs on a dashboard pool thread
+    assert 'firestore.get_all' in [span['name'] for span in trace['spans']]
@@ -0,0 +1,40 @@
+import pytest
+
+from cache_backends import MemoryBackend
+from translation import TranslationMemo, normalize_language
+
+
+def test_normalize_language():
+    assert normalize_language('English') is None
+    assert normalize_language('Hindi') == 'hi'
+    assert normalize_language('hi-IN') == 'hi'
+    with pytest.raises(ValueError):
+        normalize_language('klingon')
+
+
+def test_translations_are_memoized():
+    calls = []
+
+    def translate_batch(texts, language):
+        calls.append(list(texts))
+        return [f"{language}:{text}" for text in texts]
+
+    memo = TranslationMemo(MemoryBackend(), translate_batch)
+    assert memo.translate(['a', 'b'], 'hi') == (['hi:a', 'hi:b'], 'hi')
+    assert memo.translate(['b', 'c'], 'hi') == (['hi:b', 'hi:c'], 'hi')
+    assert calls == [['a', 'b'], ['c']]
+
+
+def test_failed_translation_reports_english():
+    def translate_batch(texts, language):
+        raise RuntimeError("upstream down")
+
+    memo = TranslationMemo(MemoryBackend(), translate_batch)
+    assert memo.translate(['a'], 'hi') == (['a'], None)
+    assert memo.stats()['hi']['failures'] == 1
+
+
+def test_unsupported_language_is_not_tracked():
+    memo = TranslationMemo(MemoryBackend(), lambda texts, language: texts)
+    assert memo.translate(['a'], 'klingon') == (['a'], None)
+    assert memo.stats() == {}
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import WEATHER
+
+
+@pytest.fixture
+def fetches(app_module, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, 'fetch_weather_data', lambda lat, lon: calls.append((lat, lon)) or WEATHER)
+    return calls
+
+
+def test_points_in_one_tile_share_a_fetch(client, fetches):
+    response = client.post('/weather', json={'points': [{'lat': 12.341, 'lon': 76.551}, [12.343, 76.549]]})
+
+    body = response.get_json()
+    assert response.status_code == 200 and body['tilesFetched'] == 1
+    assert fetches == [(12.34, 76.55)]
+    assert [result['tile'] for result in body['results']] == [{'lat': 12.34, 'lon': 76.55}] * 2
+
+
+def test_points_are_capped(app_module, client, fetches):
+    points = ';'.join(f'{10 + i * 0.1:.1f},77' for i in range(app_module.MAX_WEATHER_POINTS + 1))
+
+    response = client.get('/weather', query_string={'points': points})
+    assert response.status_code == 400
+    assert fetches == []
+
+
+@pytest.mark.parametrize('body', [
+    [{'lat': 12.3, 'lon': 76.5}],
+    {'points': ['12']},
+    {'points': [[12.3, 76.5, 3]]},
+    {'points': [{'lat': 12.3}]},
+    {'points': [{'lat': 'north', 'lon': 76.5}]},
+    {'points': [[95, 76.5]]},
+    {'points': []},
+    {'points': {'lat': 12.3, 'lon': 76.5}},
+])
+def test_malformed_points_are_rejected(client, fetches, body):
+    response = client.post('/weather', json=body)
+
+    assert response.status_code == 400, response.get_json()
+    assert fetches == []
+
+
+def test_malformed_query_points_are_rejected(client, fetches):
+    assert client.get('/weather', query_string={'points': '12.3,76.5;12'}).status_code == 400
+    assert fetches == []
@@ -0,0 +1,100 @@
+import contextvars
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class Trace:
+    def __init__(self, name, attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def to_dict(self, duration):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'startedAt': self.started_at.isoformat(),
+            'durationMs': round(duration * 1000, 1),
+            **self.attrs,
+            'spans': list(self.spans)
+        }
+
+
+class Tracer:
+    """Records spans per request; keeps every slow trace and a small sample of the rest in ring buffers"""
+
+    def __init__(self, sample_rate=0.01, slow_threshold=3.0, capacity=100):
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.slow = deque(maxlen=capacity)
+        self.sampled = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def start(self, name, **attrs):
+        """Begin a trace in the current context; pass the returned token to finish()"""
+        return _current_trace.set(Trace(name, attrs))
+
+    def finish(self, token, **attrs):
+        trace = _current_trace.get()
+        _current_trace.reset(token)
+        if trace is None:
+            return
+        duration = time.perf_counter() - trace.started
+        trace.attrs.update(attrs)
+        if duration >= self.slow_threshold:
+            with self._lock:
+                self.slow.append(trace.to_dict(duration))
+        elif random.random() < self.sample_rate:
+            with self._lock:
+                self.sampled.append(trace.to_dict(duration))
+
+    def add_span(self, name, started, duration, error=None, **attrs):
+        """Attach an already-timed span (perf_counter start, seconds) to the current trace"""
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        span = {
+            'name': name,
+            'offsetMs': round((started - trace.started) * 1000, 1),
+            'durationMs': round(duration * 1000, 1),
+        }
+        attrs = {key: value for key, value in attrs.items() if value is not None}
+        if attrs:
+            span['attrs'] = attrs
+        if error:
+            span['error'] = error
+        trace.spans.append(span)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        if _current_trace.get() is None:
+            yield
+            return
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.add_span(name, started, time.perf_counter() - started, error, **attrs)
+
+    def wrap(self, fn):
+        """Bind fn to the current trace so spans recorded on a worker thread land in it"""
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+    def traces(self, kind='slow'):
+        with self._lock:
+            return list(self.slow if kind == 'slow' else self.sampled)
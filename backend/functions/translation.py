@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from collections import Counter, defaultdict
+
+ENGLISH = {'', 'en', 'eng', 'english', 'en-us', 'en-gb', 'en-in'}
+# Languages suggestions are translated into: code -> name used in the translation prompt
+SUPPORTED_LANGUAGES = {
+    'hi': 'Hindi', 'bn': 'Bengali', 'te': 'Telugu', 'mr': 'Marathi', 'ta': 'Tamil', 'gu': 'Gujarati',
+    'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Punjabi', 'or': 'Odia', 'ur': 'Urdu', 'as': 'Assamese',
+}
+LANGUAGE_CODES = {name.lower(): code for code, name in SUPPORTED_LANGUAGES.items()}
+
+
+def normalize_language(language):
+    """Supported language code (from a code or name), or None for English; raises ValueError if unsupported"""
+    language = (language or '').strip().lower()
+    if language in ENGLISH:
+        return None
+    language = LANGUAGE_CODES.get(language, language.split('-')[0])
+    if language not in SUPPORTED_LANGUAGES:
+        raise ValueError(f"Unsupported language: {language}")
+    return language
+
+
+class TranslationMemo:
+    """Translates canonical texts once per (text hash, language) and shares the result through a cache backend"""
+
+    def __init__(self, cache, translate_batch, ttl=30 * 24 * 60 * 60):
+        self.cache = cache
+        self.translate_batch = translate_batch   # (texts, language) -> translated texts, same order
+        self.ttl = ttl
+        self._stats = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def _key(self, text, language):
+        return f"translation:{language}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def translate(self, texts, language):
+        """Return (texts, language served), calling translate_batch only for texts not translated before.
+
+        The language served is None when the texts come back in English, including when translation fails.
+        """
+        try:
+            language = normalize_language(language)
+        except ValueError:
+            language = None
+        if not language or not texts:
+            return list(texts), None
+
+        results = [self.cache.get(self._key(text, language)) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        self._count(language, hits=len(texts) - len(missing), misses=len(missing))
+        if not missing:
+            return results, language
+
+        try:
+            translated = self.translate_batch([texts[i] for i in missing], language)
+            if len(translated) != len(missing):
+                raise ValueError("Translation count does not match input")
+        except Exception as e:
+            print(f"⚠️  Translation to {language} failed: {e}")
+            self._count(language, failures=1)
+            # Fall back to the canonical English text rather than failing the request
+            return list(texts), None
+
+        for i, text in zip(missing, translated):
+            self.cache.set(self._key(texts[i], language), text, self.ttl)
+            results[i] = text
+        return results, language
+
+    def _count(self, language, **counts):
+        with self._lock:
+            self._stats[language].update(counts)
+
+    def stats(self):
+        with self._lock:
+            return {
+                language: {
+                    'hits': counts['hits'],
+                    'misses': counts['misses'],
+                    'failures': counts['failures'],
+                    'hit_rate': round(counts['hits'] / max(1, counts['hits'] + counts['misses']), 3)
+                }
+                for language, counts in self._stats.items()
+            }